@@ -0,0 +1,110 @@
+import sys, os
+import argparse
+import random
+import time
+
+# Checks that relative path data ends up at exactly the same coordinates as the same path with absolute commands, and
+# measures how long making the commands absolute takes (see to_freesewing_js.pathdata.make_absolute()).
+#
+# - The test SVGs that have a relative and an absolute version must give the same code.
+# - For lots of random paths, the code for the path and for inkex's absolute version of it must be the same, and the
+#   NumPy and pure Python versions of make_absolute() must give the same coordinates, to the last bit.
+#
+# Exits with status 1 if any of these differ.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (relative, absolute) versions of the same paths
+test_svg_pairs = [
+    ('two_curves_relative.svg', 'two_curves_absolute.svg'),
+    ('multipart_curve_relative.svg', 'multipart_curve_absolute.svg'),
+]
+
+def make_path_data(num_nodes, relative_fraction, rnd, arcs=True):
+    ''' A path with all kinds of commands, with decimals, where about relative_fraction of the commands is relative.
+    A new subpath starts every 50 nodes or so. '''
+    def coord():
+        return f"{rnd.uniform(-50, 50):.{rnd.randint(0, 6)}f}"
+    num_args = {'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2}
+    commands = [f"M {coord()},{coord()}"]
+    for index in range(1, num_nodes):
+        if rnd.random() < 0.02:
+            commands.append(rnd.choice(["z", "Z"]))
+            kind = 'M'
+            args = [coord(), coord()]
+        else:
+            kind = rnd.choice('LHVCSQTA' if arcs else 'LHVCSQT')
+            if kind == 'A':
+                args = [coord().lstrip('-'), coord().lstrip('-'), coord(), str(rnd.randint(0, 1)), str(rnd.randint(0, 1)), coord(), coord()]
+            else:
+                args = [coord() for _ in range(num_args[kind])]
+        commands.append(f"{kind.lower() if rnd.random() < relative_fraction else kind} {' '.join(args)}")
+    return ' '.join(commands)
+
+def path_code(to_freesewing_js, path):
+    # The code for an inkex.paths.Path, with all the digits there are.
+    converter = to_freesewing_js.Converter(to_freesewing_js.ConvertOptions(fp_precision=17), lambda message: None)
+    converter.scaling = to_freesewing_js.Scaling(converter.msg)
+    converter.current_element_id = "path"
+    converter.path_to_code(to_freesewing_js.PathData.from_path(path))
+    return converter.points_code + converter.path_code
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Check that relative and absolute path data give the same coordinates.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to check")
+    pars.add_argument("--paths", type=int, default=200, help="number of random paths")
+    pars.add_argument("--nodes", type=int, default=50000, help="number of nodes in the path to measure the speed with")
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import inkex.paths
+    import to_freesewing_js
+    from to_freesewing_js import pathdata
+
+    failures = []
+
+    for relative_svg, absolute_svg in test_svg_pairs:
+        results = []
+        for name in (relative_svg, absolute_svg):
+            with open(os.path.join(repo_dir, 'test_svgs', name), 'rb') as file:
+                result = to_freesewing_js.convert(file.read())
+            results.append([(path.points_code, path.path_code) for part in result.parts for path in part.paths])
+        if results[0] != results[1]:
+            failures.append(f"{relative_svg} and {absolute_svg}")
+
+    rnd = random.Random(1)
+    for index in range(options.paths):
+        # Arcs aren't converted to code without a transform_path() first, which makes them absolute itself.
+        d = make_path_data(rnd.choice([10, 100, 1000]), rnd.choice([0.5, 0.9, 1.0]), rnd, arcs=False)
+        # Not via path data, which only has 6 digits.
+        path = inkex.paths.Path(d)
+        if path_code(to_freesewing_js, path) != path_code(to_freesewing_js, path.to_absolute()):
+            failures.append(f"random path {index}")
+        if pathdata.numpy is not None:
+            path = pathdata.PathData.from_path(inkex.paths.Path(make_path_data(rnd.choice([10, 100, 1000]), rnd.choice([0.5, 0.9, 1.0]), rnd)))
+            with_numpy = pathdata.make_absolute_numpy(path)
+            if with_numpy is not None and with_numpy.tobytes() != pathdata.make_absolute_python(path).tobytes():
+                failures.append(f"random path {index} with NumPy")
+
+    # Like the paths Inkscape writes: all relative, many nodes per subpath.
+    path = pathdata.PathData.from_path(inkex.paths.Path(make_path_data(options.nodes, 1.0, random.Random(2))))
+    print(f"{len(test_svg_pairs)} test SVG pairs and {options.paths} random paths checked, {len(failures)} differ")
+    print(f"Making a path with {options.nodes} relative nodes absolute:")
+    versions = [("pure Python", pathdata.make_absolute_python)]
+    if pathdata.numpy is not None:
+        versions.append(("NumPy", pathdata.make_absolute_numpy))
+    for name, make_absolute in versions:
+        best = None
+        for run in range(3):
+            start = time.perf_counter()
+            make_absolute(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {name:12} {best * 1000:8.1f} ms")
+
+    for failure in failures:
+        print(f"DIFFERENT: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import sys, os
+import argparse
+import math
+import random
+import re
+import time
+
+# Checks how close the curves that arcs are converted to are to the exact arcs, for lots of random arcs, and measures
+# how long converting them takes. For every arc, points along the curves are compared with the ellipse the arc is on,
+# and the ends of the curves with the ends of the arc. Exits with status 1 if any curve is further from its arc than
+# the tolerance. The same is checked for a circle in a document, drawn directly and by clones that enlarge it.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_arcs(num_arcs, seed=1):
+    ''' Random arcs: (x1, y1, rx, ry, x axis rotation, large arc flag, sweep flag, x2, y2). Some have radii too small to
+    reach their end point, which then get scaled up. '''
+    rnd = random.Random(seed)
+    arcs = []
+    for _ in range(num_arcs):
+        arcs.append((
+            rnd.uniform(-100, 100), rnd.uniform(-100, 100),
+            rnd.uniform(0.5, 200), rnd.uniform(0.5, 200), rnd.uniform(-180, 180),
+            rnd.randint(0, 1), rnd.randint(0, 1),
+            rnd.uniform(-100, 100), rnd.uniform(-100, 100),
+        ))
+    return arcs
+
+def distance_to_ellipse(x, y, cx, cy, rx, ry, cos_phi, sin_phi):
+    # In the coordinates of the ellipse, find the nearest point on it with a few Newton steps from the point at the
+    # same angle.
+    dx, dy = x - cx, y - cy
+    u = cos_phi * dx + sin_phi * dy
+    v = -sin_phi * dx + cos_phi * dy
+    t = math.atan2(v / ry, u / rx)
+    for _ in range(8):
+        cos_t, sin_t = math.cos(t), math.sin(t)
+        ex, ey = rx * cos_t - u, ry * sin_t - v
+        derivative = -ex * rx * sin_t + ey * ry * cos_t
+        second_derivative = (rx * sin_t) ** 2 + (ry * cos_t) ** 2 - ex * rx * cos_t - ey * ry * sin_t
+        if second_derivative <= 0:
+            break
+        t -= derivative / second_derivative
+    return math.hypot(rx * math.cos(t) - u, ry * math.sin(t) - v)
+
+def cubic_point(x0, y0, x1, y1, x2, y2, x3, y3, t):
+    s = 1 - t
+    return (s * s * s * x0 + 3 * s * s * t * x1 + 3 * s * t * t * x2 + t * t * t * x3,
+            s * s * s * y0 + 3 * s * s * t * y1 + 3 * s * t * t * y2 + t * t * t * y3)
+
+# A circle with radius 10 around 0,0 in a document of 10 mm per user unit, drawn directly and by clones, one of them
+# twice as large. By path id: the center and radius of the circle in mm.
+clone_document = """<svg width="1000mm" height="1000mm" viewBox="0 0 100 100"
+    xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+    xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape">
+  <defs><path id="circle" d="M -10,0 A 10,10 0 0 1 10,0 A 10,10 0 0 1 -10,0 Z" /></defs>
+  <g inkscape:label="part: circles" inkscape:groupmode="layer" id="layer1">
+    <path id="direct" transform="translate(20,20)" d="M -10,0 A 10,10 0 0 1 10,0 A 10,10 0 0 1 -10,0 Z" />
+    <use xlink:href="#circle" id="clone" x="50" y="50" />
+    <use xlink:href="#circle" id="large_clone" transform="translate(50,20) scale(2)" />
+  </g>
+</svg>"""
+clone_circles = {'direct': (200, 200, 100), 'clone': (500, 500, 100), 'large_clone': (500, 200, 200)}
+
+def check_clones(to_freesewing_js, tolerance, samples):
+    ''' Convert clone_document and return, for every path in it, its id, number of curves and how far they are at
+    most from the circle. The points are read from the code, and for the clones transformed by the matrix they are
+    drawn with. '''
+    design = to_freesewing_js.convert(clone_document, to_freesewing_js.ConvertOptions(fp_precision=10, arc_tolerance=tolerance))
+    part = design.parts[0]
+    # Older checkouts have the code on the definitions themselves.
+    definition_codes = dict((entry[0].get_fs_name(), entry[1]) if isinstance(entry, tuple) else (entry.get_fs_name(), entry.code)
+        for entry in part.clone_definitions)
+
+    results = []
+    for path in part.paths:
+        clone = re.search(r"draft_clone_(\w+)\(.*\[(.*)\]", path.path_code)
+        if clone is None:
+            points_code, matrix = path.points_code, (1, 0, 0, 1, 0, 0)
+        else:
+            points_code, matrix = definition_codes[clone.group(1)], [float(value) for value in clone.group(2).split(",")]
+        a, b, c, d, e, f = matrix
+        points = [(a * float(x) + c * float(y) + e, b * float(x) + d * float(y) + f)
+            for x, y in re.findall(r"new Point\(([-\d.e]+), ([-\d.e]+)\)", points_code)]
+
+        cx, cy, radius = clone_circles[path.id]
+        max_error = 0.0
+        # The move, then three points for every curve
+        for offset in range(1, len(points) - 2, 3):
+            x0, y0 = points[offset - 1]
+            (x1, y1), (x2, y2), (x3, y3) = points[offset:offset + 3]
+            for index in range(samples + 1):
+                x, y = cubic_point(x0, y0, x1, y1, x2, y2, x3, y3, index / samples)
+                max_error = max(max_error, abs(math.hypot(x - cx, y - cy) - radius))
+        results.append((path.id, (len(points) - 1) // 3, max_error))
+    return results
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Check the accuracy and measure the speed of the conversion of arcs to curves.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--arcs", type=int, default=10000, help="number of random arcs")
+    pars.add_argument("--tolerance", type=float, default=0.01)
+    pars.add_argument("--samples", type=int, default=32, help="number of points to check on every curve")
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import to_freesewing_js
+    from to_freesewing_js import arcs as arcs_module
+    from to_freesewing_js.arcs import arcs_to_cubics, get_center_parameters
+
+    arcs = make_arcs(options.arcs)
+
+    start = time.perf_counter()
+    all_curves = arcs_to_cubics(arcs, options.tolerance)
+    elapsed = time.perf_counter() - start
+
+    max_error = 0.0
+    max_end_error = 0.0
+    num_curves = 0
+    for arc, curves in zip(arcs, all_curves):
+        cx, cy, rx, ry, cos_phi, sin_phi, start_angle, sweep_angle = get_center_parameters(*arc)
+        x0, y0 = arc[0], arc[1]
+        for offset in range(0, len(curves), 6):
+            x1, y1, x2, y2, x3, y3 = curves[offset:offset + 6]
+            for index in range(options.samples + 1):
+                x, y = cubic_point(x0, y0, x1, y1, x2, y2, x3, y3, index / options.samples)
+                max_error = max(max_error, distance_to_ellipse(x, y, cx, cy, rx, ry, cos_phi, sin_phi))
+            x0, y0 = x3, y3
+            num_curves += 1
+        max_end_error = max(max_end_error, math.hypot(x0 - arc[7], y0 - arc[8]))
+
+    print(f"{options.arcs} arcs to {num_curves} curves, tolerance {options.tolerance}")
+    print(f"  conversion           {elapsed * 1000:8.1f} ms  ({elapsed / options.arcs * 1e6:7.2f} us per arc)")
+    # Older checkouts only have the one version.
+    if getattr(arcs_module, 'numpy', None) is not None:
+        start = time.perf_counter()
+        python_curves = arcs_module.arcs_to_cubics_python(arcs, options.tolerance)
+        python_elapsed = time.perf_counter() - start
+        print(f"  without NumPy        {python_elapsed * 1000:8.1f} ms  ({python_elapsed / options.arcs * 1e6:7.2f} us per arc)")
+        max_difference = max((abs(value - python_value) for curves, python_curves_of_arc in zip(all_curves, python_curves)
+            if curves for value, python_value in zip(curves, python_curves_of_arc)), default=0.0)
+        print(f"  max difference       {max_difference:12.6g}")
+        if [len(curves or ()) for curves in all_curves] != [len(curves or ()) for curves in python_curves] or max_difference > 1e-9:
+            print("FAILED: different curves with and without NumPy")
+            return 1
+    print(f"  max distance to arc  {max_error:12.6f}")
+    print(f"  max end point error  {max_end_error:12.6f}")
+
+    try:
+        import inkex.paths
+        start = time.perf_counter()
+        for arc in arcs:
+            inkex.paths.Arc(*arc[2:]).to_curves(inkex.Vector2d(arc[0], arc[1]))
+        inkex_elapsed = time.perf_counter() - start
+        print(f"  inkex, one by one    {inkex_elapsed * 1000:8.1f} ms  ({inkex_elapsed / options.arcs * 1e6:7.2f} us per arc)")
+    except ImportError:
+        pass
+
+    print("A circle of radius 100 mm, directly and by clones")
+    clone_results = check_clones(to_freesewing_js, options.tolerance, options.samples)
+    for path_id, num_path_curves, path_max_error in clone_results:
+        print(f"  {path_id:20} {num_path_curves:3} curves  max distance {path_max_error:.6f}")
+    max_clone_error = max(path_max_error for path_id, num_path_curves, path_max_error in clone_results)
+
+    if max_error > options.tolerance or max_end_error > 1e-9 or max_clone_error > options.tolerance:
+        print("FAILED: curves further from the arcs than the tolerance")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import sys, os
+import argparse
+import random
+import time
+
+# Measures how fast paths are converted to code, per path command: for every kind of command, a long path of only
+# that command (after the move it starts with) goes through Converter.path_to_code(), and the number of commands per
+# second is printed. Parsing and transforming aren't included. Use --extension_dir to run it against another checkout
+# and compare; it needs to have pathdata.PathData.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The commands, with their number of arguments
+commands = [('L', 2), ('l', 2), ('H', 1), ('h', 1), ('V', 1), ('v', 1), ('C', 6), ('c', 6), ('S', 4), ('s', 4),
+    ('Q', 4), ('q', 4), ('T', 2), ('t', 2)]
+
+def make_path_data(letter, num_args, num_nodes, rnd):
+    ''' A path with num_nodes nodes: a move and then only the given command. '''
+    def coord():
+        return f"{rnd.uniform(-50, 50):.4f}"
+    return f"M {coord()},{coord()} " + ' '.join(f"{letter} {' '.join(coord() for _ in range(num_args))}" for _ in range(num_nodes - 1))
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure converting long paths to code, per path command.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--nodes", type=int, default=20000, help="number of nodes in each path")
+    pars.add_argument("--runs", type=int, default=5, help="number of times to convert each path; the fastest counts")
+    pars.add_argument("--show_debug_comments", action="store_true", help="convert with debug comments")
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import inkex.paths
+    import to_freesewing_js
+    from to_freesewing_js.pathdata import PathData
+
+    converter = to_freesewing_js.Converter(to_freesewing_js.ConvertOptions(show_debug_comments=options.show_debug_comments), lambda message: None)
+    converter.scaling = to_freesewing_js.Scaling(converter.msg)
+    converter.current_element_id = "outline"
+
+    rnd = random.Random(1)
+    print(f"{options.nodes} nodes per path, best of {options.runs}")
+    total_time = 0.0
+    for letter, num_args in commands:
+        path = PathData.from_path(inkex.paths.Path(make_path_data(letter, num_args, options.nodes, rnd)))
+        best = None
+        for run in range(options.runs):
+            start = time.perf_counter()
+            converter.path_to_code(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        total_time += best
+        print(f"  {letter}  {best * 1000:8.1f} ms  {options.nodes / best / 1000:8.0f}k commands/s")
+    print(f"  all {total_time * 1000:7.1f} ms  {options.nodes * len(commands) / total_time / 1000:8.0f}k commands/s")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import sys, os
+import argparse
+import random
+import time
+
+# Measures how long converting a document with one very long path takes, like the outlines autotracing produces. With
+# --other_elements, the part also has lots of elements that aren't converted, to see what it costs to skip them. Only
+# the conversion to code is measured, not writing the files. Only uses the public to_freesewing_js API, so it can be
+# pointed at an older checkout with --extension_dir to compare before and after a change.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_path_data(num_nodes, seed=1):
+    ''' A path with num_nodes nodes, using all the commands we convert in about equal amounts. '''
+    rnd = random.Random(seed)
+    def coord():
+        return f"{rnd.uniform(-50, 50):.4f}"
+    commands = ["M 100,100"]
+    for index in range(1, num_nodes):
+        kind = index % 7
+        if kind == 0:
+            commands.append(f"l {coord()},{coord()}")
+        elif kind == 1:
+            commands.append(f"L {coord()},{coord()}")
+        elif kind == 2:
+            commands.append(f"c {coord()},{coord()} {coord()},{coord()} {coord()},{coord()}")
+        elif kind == 3:
+            commands.append(f"C {coord()},{coord()} {coord()},{coord()} {coord()},{coord()}")
+        elif kind == 4:
+            commands.append(f"h {coord()}")
+        elif kind == 5:
+            commands.append(f"V {coord()}")
+        else:
+            commands.append(f"v {coord()}")
+    commands.append("Z")
+    return ' '.join(commands)
+
+def make_other_elements(num_elements):
+    ''' Elements that aren't converted, like the text, images and groups of a real pattern sheet. '''
+    kinds = [
+        '<text id="text{0}" x="10" y="10">label {0}</text>',
+        '<image id="image{0}" x="0" y="0" width="10" height="10" xlink:href="scan.png" />',
+        '<g id="g{0}"><desc id="desc{0}">note</desc></g>',
+        '<linearGradient id="gradient{0}"><stop id="stop{0}" offset="0" /></linearGradient>',
+    ]
+    return '\n    '.join(kinds[index % len(kinds)].format(index) for index in range(num_elements))
+
+def make_document(num_nodes, num_other_elements=0):
+    return f'''<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+    xmlns:xlink="http://www.w3.org/1999/xlink" width="210mm" height="297mm" viewBox="0 0 210 297">
+  <g inkscape:groupmode="layer" inkscape:label="part: outline" id="layer1">
+    <path id="outline" d="{make_path_data(num_nodes)}" />
+    {make_other_elements(num_other_elements)}
+  </g>
+</svg>
+'''.encode('utf-8')
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure conversion time of a document with one very long path.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--nodes", type=int, default=50000, help="number of nodes in the path")
+    pars.add_argument("--other_elements", type=int, default=0, help="number of elements that aren't converted, in the same layer")
+    pars.add_argument("--runs", type=int, default=3)
+    pars.add_argument("--show_debug_comments", action='store_true')
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import to_freesewing_js
+
+    document = to_freesewing_js.load_document(make_document(options.nodes, options.other_elements))
+    convert_options = to_freesewing_js.ConvertOptions(show_debug_comments=options.show_debug_comments)
+
+    timings = []
+    for _ in range(options.runs):
+        start = time.perf_counter()
+        to_freesewing_js.convert(document, convert_options)
+        timings.append(time.perf_counter() - start)
+
+    print(f"1 path with {options.nodes} nodes and {options.other_elements} other elements, {options.runs} runs")
+    best = min(timings)
+    if options.other_elements > 0:
+        print(f"  best run             {best * 1000:8.1f} ms  ({best / (options.other_elements + 1) * 1e6:7.2f} us per element)")
+    else:
+        print(f"  best run             {best * 1000:8.1f} ms  ({best / options.nodes * 1e6:7.2f} us per node)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import sys, os
+import argparse
+import tracemalloc
+
+# Measures how much memory the path data of a long path takes per node, parsed by inkex (an inkex.paths.Path) and as
+# the PathData it is converted to, which is what is kept while converting (see to_freesewing_js.pathdata). The path is
+# the same as in convert_time.py, with all the commands we convert in about equal amounts.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def allocated_by(make):
+    ''' The value make() returns, and the number of bytes allocated for it that are still in use after. '''
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = make()
+        return (value, tracemalloc.get_traced_memory()[0] - before)
+    finally:
+        tracemalloc.stop()
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure the memory per node of parsed path data.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--nodes", type=int, default=100000, help="number of nodes in the path")
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import inkex.paths
+    from to_freesewing_js.pathdata import PathData
+    from convert_time import make_path_data
+
+    d = make_path_data(options.nodes)
+    path, path_size = allocated_by(lambda: inkex.paths.Path(d))
+    path_data, path_data_size = allocated_by(lambda: PathData.from_path(path))
+
+    print(f"{options.nodes} nodes")
+    print(f"  inkex.paths.Path  {path_size / options.nodes:8.1f} bytes per node")
+    print(f"  PathData          {path_data_size / options.nodes:8.1f} bytes per node  ({path_size / path_data_size:.1f}x smaller)")
+
+if __name__ == '__main__':
+    sys.exit(main())
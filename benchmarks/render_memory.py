@@ -0,0 +1,67 @@
+import sys, os
+import argparse
+import subprocess
+import tempfile
+
+# Measures how much the peak memory use (RSS) grows while rendering and writing the generated files, for synthetic
+# designs of increasing size. Each size is measured in a fresh process, because the peak RSS of a process never goes
+# down. The design itself has to be in memory anyway, so only the growth on top of that is reported: with the files
+# streamed to disk it should stay about the same no matter how big the design is.
+#
+# Like render_time.py it only uses the public to_freesewing_js API, so --extension_dir can point at an older checkout.
+# Uses the 'resource' module, so doesn't run on Windows.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def measure(extension_dir, num_parts, paths_per_part, points_per_path):
+    ''' Runs in the child process. Prints the peak RSS after making the design and after writing it, in MB.
+    '''
+    sys.path.insert(0, os.path.abspath(extension_dir))
+    import to_freesewing_js
+    from render_time import make_design
+
+    parts = make_design(to_freesewing_js, num_parts, paths_per_part, points_per_path)
+    # Load the templates before measuring, that's a fixed cost.
+    to_freesewing_js.render_design("warmup", [])
+    before = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        sources = to_freesewing_js.render_design("benchmark", parts)
+        result = to_freesewing_js.DesignResult("benchmark", parts, sources, [])
+        to_freesewing_js.write_design(result, output_dir)
+        after = peak_rss_mb()
+        output_size = sum(os.path.getsize(os.path.join(root, name)) for root, dirs, names in os.walk(output_dir) for name in names)
+
+    print(before, after, output_size / (1024 * 1024))
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure peak memory growth of rendering and writing designs of increasing size.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--parts", type=int, default=10)
+    pars.add_argument("--paths", type=int, nargs='+', default=[50, 200, 800], help="paths per part, one measurement per value")
+    pars.add_argument("--points", type=int, default=50, help="points per path")
+    pars.add_argument("--child", action='store_true', help=argparse.SUPPRESS)
+    options = pars.parse_args(argv)
+
+    if options.child:
+        measure(options.extension_dir, options.parts, options.paths[0], options.points)
+        return 0
+
+    print(f"{options.parts} parts x N paths x {options.points} points")
+    print(f"  {'paths':>8} {'output':>10} {'design':>10} {'growth':>10}")
+    for paths_per_part in options.paths:
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+            f"--extension_dir={options.extension_dir}", f"--parts={options.parts}",
+            f"--paths={paths_per_part}", f"--points={options.points}"], capture_output=True, text=True, check=True)
+        before, after, output_size = (float(value) for value in completed.stdout.split())
+        print(f"  {options.parts * paths_per_part:8} {output_size:7.1f} MB {before:7.1f} MB {after - before:7.1f} MB")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import sys, os
+import argparse
+import time
+
+# Measures how long rendering the generated files takes for a large synthetic design, per path file. Only uses the
+# public to_freesewing_js API, so it can be pointed at an older checkout with --extension_dir to compare before and
+# after a change.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_design(to_freesewing_js, num_parts, paths_per_part, points_per_path):
+    parts = []
+    for part_index in range(num_parts):
+        part = to_freesewing_js.Part(f"part{part_index}")
+        for path_index in range(paths_per_part):
+            path = to_freesewing_js.Path(f"path{part_index}_{path_index}")
+            points_code = f"// Path: {path.id}\n"
+            path_code = f"paths.{path.id} = new Path()\n"
+            for point_index in range(1, points_per_path + 1):
+                point_name = f"{path.id}_p{point_index}"
+                points_code += f"points.{point_name} = new Point({point_index * 1.5}, {point_index * 2.25})\n"
+                path_code += f"    .{'move' if point_index == 1 else 'line'}(points.{point_name})\n"
+            path.points_code = points_code
+            path.path_code = path_code
+            part.paths.append(path)
+        parts.append(part)
+    return parts
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure render time of the generated files for a large synthetic design.")
+    pars.add_argument("--extension_dir", type=str, default=os.path.join(repo_dir, 'extension'), help="the 'extension' directory of the checkout to measure")
+    pars.add_argument("--parts", type=int, default=10)
+    pars.add_argument("--paths", type=int, default=30, help="paths per part")
+    pars.add_argument("--points", type=int, default=50, help="points per path")
+    pars.add_argument("--runs", type=int, default=5)
+    pars.add_argument("--template", action='store_true', help="render path files with the template instead of the direct emitter")
+    options = pars.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(options.extension_dir))
+    import to_freesewing_js
+
+    parts = make_design(to_freesewing_js, options.parts, options.paths, options.points)
+    num_paths = options.parts * options.paths
+
+    timings = []
+    for _ in range(options.runs):
+        start = time.perf_counter()
+        if options.template:
+            to_freesewing_js.render_design("benchmark", parts, direct_emitter=False)
+        else:
+            to_freesewing_js.render_design("benchmark", parts)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{options.parts} parts x {options.paths} paths x {options.points} points, {options.runs} runs")
+    print(f"  first run            {timings[0] * 1000:8.1f} ms  ({timings[0] / num_paths * 1e6:7.1f} us per path file)")
+    best = min(timings)
+    print(f"  best run             {best * 1000:8.1f} ms  ({best / num_paths * 1e6:7.1f} us per path file)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import sys, os
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Measures what it costs to start the extension, per export mode: wall clock time of a complete run on a tiny document,
+# and how much of that is spent importing modules (using python -X importtime). Run it before and after a change to see
+# whether the cold-start latency regressed.
+#
+# In 'selection' mode copying to the clipboard fails when there is no clipboard (e.g. over ssh); that doesn't matter
+# for the import times.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+extension_script = os.path.join(repo_dir, 'extension', 'to-freesewing-js.py')
+test_svg = os.path.join(repo_dir, 'test_svgs', 'lines.svg')
+
+# Modules worth reporting separately.
+interesting_modules = ['inkex', 'jinja2', 'pyperclip', 'to_freesewing_js.converter', 'to_freesewing_js.output']
+
+def parse_importtime(stderr):
+    ''' Returns (total import time of all top-level imports, {module: cumulative time}) in seconds.
+    '''
+    total = 0
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        # Nested imports are indented; only count the outermost ones for the total.
+        if not name[1:].startswith(' '):
+            total += int(cumulative_us)
+        cumulative[module] = cumulative.get(module, 0) + int(cumulative_us)
+    return (total / 1e6, {module: us / 1e6 for module, us in cumulative.items()})
+
+def run_once(mode, output_dir):
+    args = [sys.executable, '-X', 'importtime', extension_script, f"--export_what={mode}", f"--output_dir={output_dir}"]
+    if mode == "selection":
+        args.append("--id=path1")
+    args.append(test_svg)
+
+    start = time.perf_counter()
+    completed = subprocess.run(args, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    import_total, per_module = parse_importtime(completed.stderr)
+    return (wall, import_total, per_module)
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Measure extension startup and import time per export mode.")
+    pars.add_argument("--runs", type=int, default=10)
+    options = pars.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for mode in ["all", "selection"]:
+            # Once to warm up the OS file cache and write the .pyc files.
+            run_once(mode, output_dir)
+            results = [run_once(mode, output_dir) for _ in range(options.runs)]
+
+            print(f"Mode '{mode}' ({options.runs} runs, median):")
+            print(f"  wall time            {statistics.median(r[0] for r in results) * 1000:8.1f} ms")
+            print(f"  all imports          {statistics.median(r[1] for r in results) * 1000:8.1f} ms")
+            for module in interesting_modules:
+                times = [r[2].get(module, 0) for r in results]
+                print(f"  {module:<28} {statistics.median(times) * 1000:8.1f} ms")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
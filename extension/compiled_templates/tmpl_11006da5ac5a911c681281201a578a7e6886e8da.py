@@ -0,0 +1,14 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'i18n_strings.json.tpl'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    pass
+    yield '{\n  "t": "Your Design",\n  "d": "This is your own design, from scratch",\n  "p": {},\n  "s": {\n    "whatWillYouCreateToday": "What will you create today?"\n  },\n  "o": {}\n}'
+
+blocks = {}
+debug_info = ''
\ No newline at end of file
@@ -0,0 +1,60 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'index.mjs.tpl'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_parts = resolve('parts')
+    l_0_design_name = resolve('design_name')
+    try:
+        t_1 = environment.filters['capitalize']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'capitalize' found.")
+    try:
+        t_2 = environment.filters['lower']
+    except KeyError:
+        @internalcode
+        def t_2(*unused):
+            raise TemplateRuntimeError("No filter named 'lower' found.")
+    pass
+    yield "import { Design } from '@freesewing/core'\nimport { i18n } from '../i18n/index.mjs'"
+    for l_1_part in (undefined(name='parts') if l_0_parts is missing else l_0_parts):
+        _loop_vars = {}
+        pass
+        yield '\nimport { '
+        yield str(environment.getattr(l_1_part, 'name'))
+        yield " } from './parts/"
+        yield str(environment.getattr(l_1_part, 'name'))
+        yield '/'
+        yield str(environment.getattr(l_1_part, 'name'))
+        yield ".mjs'"
+    l_1_part = missing
+    yield '\n\n/*\n * Create the design\n */\nconst '
+    yield str(t_1((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name)))
+    yield " = new Design({\n  data: {\n    name: '"
+    yield str(t_2((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name)))
+    yield "',\n    version: '0.0.1',\n  },\n  parts: ["
+    for l_1_part in (undefined(name='parts') if l_0_parts is missing else l_0_parts):
+        _loop_vars = {}
+        pass
+        yield '\n    '
+        yield str(environment.getattr(l_1_part, 'name'))
+        yield ','
+    l_1_part = missing
+    yield '\n  ]\n})\n\nexport { '
+    for l_1_part in (undefined(name='parts') if l_0_parts is missing else l_0_parts):
+        _loop_vars = {}
+        pass
+        yield str(environment.getattr(l_1_part, 'name'))
+        yield ', '
+    l_1_part = missing
+    yield str(t_1((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name)))
+    yield ', i18n }'
+
+blocks = {}
+debug_info = '3=26&4=30&10=38&12=40&16=42&17=46&22=50'
\ No newline at end of file
@@ -0,0 +1,31 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'clone.mjs.tpl'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_definition_id = resolve('definition_id')
+    l_0_definition_fs_name = resolve('definition_fs_name')
+    l_0_code = resolve('code')
+    try:
+        t_1 = environment.filters['indent']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'indent' found.")
+    pass
+    yield "// Draws a clone of '"
+    yield str((undefined(name='definition_id') if l_0_definition_id is missing else l_0_definition_id))
+    yield "'. Each clone passes its name, which is put in front of the names of its points\n// and paths, the matrix [a, b, c, d, e, f] of its transform, and optionally how much to scale it.\nfunction draft_clone_"
+    yield str((undefined(name='definition_fs_name') if l_0_definition_fs_name is missing else l_0_definition_fs_name))
+    yield '(\n  Path,\n  Point,\n  paths,\n  points,\n  name,\n  matrix,\n  scale_x = 1,\n  scale_y = 1,\n)\n{\n    const [a, b, c, d, e, f] = matrix\n    // Used instead of Point while drawing the definition, so that all its points end up where the clone is.\n    function ClonePoint(x, y) {\n        return new Point((a * x + c * y + e) * scale_x, (b * x + d * y + f) * scale_y)\n    }\n\n    const clone_points = {}\n    const clone_paths = {}\n    draft_definition(Path, ClonePoint, clone_paths, clone_points)\n\n    for (const point_name in clone_points) {\n        points[`${name}_${point_name}`] = clone_points[point_name]\n    }\n    for (const path_name in clone_paths) {\n        paths[`${name}_${path_name}`] = clone_paths[path_name]\n    }\n}\n\nfunction draft_definition(\n  Path,\n  Point,\n  paths,\n  points,\n)\n{\n'
+    yield str(t_1((undefined(name='code') if l_0_code is missing else l_0_code)))
+    yield '\n}\n\nexport { draft_clone_'
+    yield str((undefined(name='definition_fs_name') if l_0_definition_fs_name is missing else l_0_definition_fs_name))
+    yield ' }'
+
+blocks = {}
+debug_info = '1=21&3=23&39=25&42=27'
\ No newline at end of file
@@ -0,0 +1,73 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'part.mjs.tpl'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_paths = resolve('paths')
+    l_0_design_name = resolve('design_name')
+    l_0_part_name = resolve('part_name')
+    l_0_measurements = resolve('measurements')
+    l_0_options = resolve('options')
+    try:
+        t_1 = environment.filters['capitalize']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'capitalize' found.")
+    pass
+    yield "import { pctBasedOn } from '@freesewing/core'"
+    for l_1_path in (undefined(name='paths') if l_0_paths is missing else l_0_paths):
+        _loop_vars = {}
+        pass
+        yield '\nimport { draft_'
+        yield str(context.call(environment.getattr(l_1_path, 'get_fs_name'), _loop_vars=_loop_vars))
+        yield " } from './paths/draft_"
+        yield str(context.call(environment.getattr(l_1_path, 'get_fs_name'), _loop_vars=_loop_vars))
+        yield ".mjs'"
+    l_1_path = missing
+    yield '\n\nfunction draft'
+    yield str(t_1((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name)))
+    yield str(t_1((undefined(name='part_name') if l_0_part_name is missing else l_0_part_name)))
+    yield '({\n  Path,\n  Point,\n  paths,\n  points,\n  measurements,\n  options,\n  utils,\n  macro,\n  part\n}) {'
+    for l_1_path in (undefined(name='paths') if l_0_paths is missing else l_0_paths):
+        _loop_vars = {}
+        pass
+        yield '\n    draft_'
+        yield str(environment.getattr(l_1_path, 'id'))
+        yield '(Path, Point, paths, points, measurements, options, utils, macro, part)'
+    l_1_path = missing
+    yield '\n\n    return part\n}\n\nexport const '
+    yield str((undefined(name='part_name') if l_0_part_name is missing else l_0_part_name))
+    yield " = {\n    name: '"
+    yield str((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name))
+    yield '.'
+    yield str((undefined(name='part_name') if l_0_part_name is missing else l_0_part_name))
+    yield "',\n    draft: draft"
+    yield str(t_1((undefined(name='design_name') if l_0_design_name is missing else l_0_design_name)))
+    yield str(t_1((undefined(name='part_name') if l_0_part_name is missing else l_0_part_name)))
+    yield ',\n\n    measurements: [\n        // Enter the measurements your design needs here. See https://freesewing.dev/reference/measurements .'
+    for l_1_m in (undefined(name='measurements') if l_0_measurements is missing else l_0_measurements):
+        _loop_vars = {}
+        pass
+        yield "\n      '"
+        yield str(l_1_m)
+        yield "',"
+    l_1_m = missing
+    yield "\n    ],\n    options: {\n        // Enter your pattern options here. Example:\n        /*\n        extraLength: {\n            pct: 10,\n            min: 5,\n            max: 20,\n            label: 'Extra length',\n            menu: 'fit',\n            ...pctBasedOn('neck')\n        }\n        */"
+    for l_1_o in (undefined(name='options') if l_0_options is missing else l_0_options):
+        _loop_vars = {}
+        pass
+        yield '\n        '
+        yield str(l_1_o)
+        yield ": {\n            pct: 10,\n            min: 5,\n            max: 20,\n            label: '"
+        yield str(l_1_o)
+        yield "',\n            menu: 'fit'\n        }"
+    l_1_o = missing
+    yield '\n    }\n}'
+
+blocks = {}
+debug_info = '3=23&4=27&7=33&18=36&19=40&25=44&26=46&27=50&31=53&32=57&47=61&48=65&52=67'
\ No newline at end of file
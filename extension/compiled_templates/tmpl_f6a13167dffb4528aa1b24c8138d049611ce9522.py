@@ -0,0 +1,36 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'path.mjs.tpl'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_imports = resolve('imports')
+    l_0_path_fs_name = resolve('path_fs_name')
+    l_0_points_code = resolve('points_code')
+    l_0_path_code = resolve('path_code')
+    try:
+        t_1 = environment.filters['indent']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'indent' found.")
+    pass
+    if (undefined(name='imports') if l_0_imports is missing else l_0_imports):
+        pass
+        yield str((undefined(name='imports') if l_0_imports is missing else l_0_imports))
+        yield '\n'
+    yield 'function draft_'
+    yield str((undefined(name='path_fs_name') if l_0_path_fs_name is missing else l_0_path_fs_name))
+    yield '(\n  Path,\n  Point,\n  paths,\n  points,\n  measurements,\n  options,\n  utils,\n  macro,\n  part,\n)\n{\n'
+    yield str(t_1((undefined(name='points_code') if l_0_points_code is missing else l_0_points_code)))
+    yield '\n'
+    yield str(t_1((undefined(name='path_code') if l_0_path_code is missing else l_0_path_code)))
+    yield '\n}\n\nexport { draft_'
+    yield str((undefined(name='path_fs_name') if l_0_path_fs_name is missing else l_0_path_fs_name))
+    yield ' }'
+
+blocks = {}
+debug_info = '1=21&2=26&14=28&15=30&18=32'
\ No newline at end of file
@@ -0,0 +1,42 @@
+// Draws a clone of '{{ definition_id }}'. Each clone passes its name, which is put in front of the names of its points
+// and paths, the matrix [a, b, c, d, e, f] of its transform, and optionally how much to scale it.
+function draft_clone_{{ definition_fs_name }}(
+  Path,
+  Point,
+  paths,
+  points,
+  name,
+  matrix,
+  scale_x = 1,
+  scale_y = 1,
+)
+{
+    const [a, b, c, d, e, f] = matrix
+    // Used instead of Point while drawing the definition, so that all its points end up where the clone is.
+    function ClonePoint(x, y) {
+        return new Point((a * x + c * y + e) * scale_x, (b * x + d * y + f) * scale_y)
+    }
+
+    const clone_points = {}
+    const clone_paths = {}
+    draft_definition(Path, ClonePoint, clone_paths, clone_points)
+
+    for (const point_name in clone_points) {
+        points[`${name}_${point_name}`] = clone_points[point_name]
+    }
+    for (const path_name in clone_paths) {
+        paths[`${name}_${path_name}`] = clone_paths[path_name]
+    }
+}
+
+function draft_definition(
+  Path,
+  Point,
+  paths,
+  points,
+)
+{
+{{ code | indent }}
+}
+
+export { draft_clone_{{ definition_fs_name }} }
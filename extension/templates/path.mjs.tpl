@@ -1,4 +1,5 @@
-function draft_{{ path_fs_name }}(
+{% if imports %}{{ imports }}
+{% endif %}function draft_{{ path_fs_name }}(
   Path,
   Point,
   paths,
@@ -0,0 +1,97 @@
+import sys, os
+import argparse
+import concurrent.futures
+import glob
+import time
+
+import to_freesewing_js
+
+# Command line tool to convert many SVG files at once, without going through Inkscape. Each document is converted in
+# its own worker process by the to_freesewing_js package, the same code the extension uses, so the output is exactly
+# the same as when running 'Export to FreeSewing JS...' with 'All, as a complete design' from within Inkscape.
+#
+# Example:
+#   python to-freesewing-js-batch.py --output_root out "traced/**/*.svg"
+#
+# Every input file gets its own design directory under the output root, named after the SVG file. Input files with the
+# same name (from different directories) would end up in the same design directory, so those are refused.
+
+def collect_input_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files
+
+def convert_file(svg_file, output_dir, options, force_overwrite, streaming=False):
+    ''' Runs in a worker process. Returns (svg_file, output_dir, elapsed seconds, messages, error message or None).
+    '''
+    start = time.perf_counter()
+    messages = []
+    error = None
+    try:
+        if streaming:
+            result = to_freesewing_js.convert_streaming(svg_file, options, msg=messages.append)
+        else:
+            result = to_freesewing_js.convert(svg_file, options, msg=messages.append)
+        to_freesewing_js.write_design(result, output_dir, force_overwrite)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return (svg_file, output_dir, time.perf_counter() - start, messages, error)
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Convert SVG files to FreeSewing designs without launching Inkscape.")
+    pars.add_argument("inputs", nargs='+', help="SVG files or glob patterns (quote them; '**' is supported)")
+    pars.add_argument("--output_root", type=str, required=True, help="directory in which a design directory is made for each SVG file")
+    pars.add_argument("--jobs", type=int, default=os.cpu_count(), help="number of worker processes (default: number of CPUs)")
+    pars.add_argument("--fp_precision", type=int, default=4)
+    pars.add_argument("--arc_tolerance", type=float, default=0.01, help="how far the curves that arcs are converted to may be from the arcs, in mm (default: 0.01)")
+    pars.add_argument("--show_debug_comments", action='store_true')
+    pars.add_argument("--force_overwrite", action='store_true')
+    pars.add_argument("--streaming", action='store_true', help="convert part layers while reading the file instead of loading it completely first, for very big files")
+    options = pars.parse_args(argv)
+
+    svg_files = collect_input_files(options.inputs)
+    if len(svg_files) == 0:
+        print("No input files found.", file=sys.stderr)
+        return 1
+
+    convert_options = to_freesewing_js.ConvertOptions(options.fp_precision, options.show_debug_comments, arc_tolerance=options.arc_tolerance)
+
+    jobs = []
+    svg_files_by_output_dir = {}
+    for svg_file in svg_files:
+        design_dir_name = os.path.splitext(os.path.basename(svg_file))[0]
+        output_dir = os.path.join(options.output_root, design_dir_name)
+        svg_files_by_output_dir.setdefault(os.path.normcase(output_dir), []).append(svg_file)
+        jobs.append((os.path.abspath(svg_file), output_dir))
+
+    # Before converting anything, so no design is written into another one.
+    duplicates = [files for files in svg_files_by_output_dir.values() if len(files) > 1]
+    if duplicates:
+        for files in duplicates:
+            print(f"These files would all be written to the same design directory, rename them: {', '.join(files)}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, options.jobs)) as executor:
+        futures = [executor.submit(convert_file, svg_file, output_dir, convert_options, options.force_overwrite, options.streaming) for svg_file, output_dir in jobs]
+        for future in concurrent.futures.as_completed(futures):
+            svg_file, output_dir, elapsed, messages, error = future.result()
+            for message in messages:
+                print(f"{svg_file}: {message}", file=sys.stderr)
+            if error is None:
+                print(f"{elapsed:8.3f}s  {svg_file} -> {output_dir}")
+            else:
+                failures += 1
+                print(f"{elapsed:8.3f}s  {svg_file} FAILED: {error}")
+    total = time.perf_counter() - start
+
+    print(f"Converted {len(jobs) - failures} of {len(jobs)} files in {total:.3f}s using {options.jobs} worker(s).")
+    return 0 if failures == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
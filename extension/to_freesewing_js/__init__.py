@@ -0,0 +1,45 @@
+''' Conversion of Inkscape SVG documents to FreeSewing Javascript code.
+
+This is the code behind the 'Export to FreeSewing JS...' extension, usable without Inkscape's extension machinery:
+
+    import to_freesewing_js
+
+    result = to_freesewing_js.convert(open('shirt.svg', 'rb').read())
+    for source in result.sources:
+        print(source.path, len(source.code))
+    to_freesewing_js.write_design(result, 'designs/shirt')
+
+Only inkex (and lxml) need to be importable; the other dependencies are vendored in the 'site-packages' directory next
+to this package.
+'''
+
+import sys, os
+
+lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'site-packages')
+if lib_path not in sys.path:
+    sys.path.append(lib_path)
+
+# Names are imported from their modules on first use (PEP 562), so that e.g. the extension in 'selection' mode or as a
+# client of the daemon doesn't pay for importing things it never uses, like jinja2.
+_exports = {
+    'Part': 'model', 'Path': 'model', 'clean_name': 'model',
+    'PathData': 'pathdata',
+    'ConvertOptions': 'model', 'DesignResult': 'model',
+    'ScalingMode': 'scaling', 'Scaling': 'scaling',
+    'FileExistsBehaviour': 'output', 'SourceFile': 'output', 'render_design': 'output', 'write_design': 'output',
+    'indent_filter': 'templates',
+    'DocumentIndex': 'index',
+    'Converter': 'converter', 'load_document': 'converter', 'convert': 'converter', 'convert_selection': 'converter',
+    'convert_streaming': 'streaming',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Same as 'from .module import name'. Not importlib.import_module(), so that python -X importtime still sees it.
+    module = __import__(f"{__name__}.{_exports[name]}", fromlist=[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,220 @@
+''' Conversion of elliptical arcs (the A and a path commands) to cubic Beziers, which is what FS paths have.
+
+All arcs of a path are converted in one go: first the center parameterization of every arc (see
+https://www.w3.org/TR/SVG11/implnote.html#ArcImplementationNotes), then the curves of all of them. With NumPy, each
+step is an array operation over all arcs, or all curves of all arcs; without it, or for just a few arcs, it's a loop
+over the arcs.
+'''
+
+import math
+
+# NumPy comes with inkex, but arcs_to_cubics() works without it too.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# How far (in mm, after transforming) the curves may be from the exact arc, if the options don't say.
+default_arc_tolerance = 0.01
+
+def segment_error(radius, angle):
+    # An upper bound of how far a cubic Bezier with the usual control points (at 4/3 * tan(angle / 4) times the radius
+    # along the tangents) is from a circular arc over angle. It's about twice the actual error, and for an ellipse,
+    # radius is the largest of the two radii.
+    sin = math.sin(angle / 4)
+    cos = math.cos(angle / 4)
+    return radius * 4 / 27 * sin ** 6 / (cos * cos)
+
+def get_num_segments(radius, sweep_angle, tolerance):
+    # At least one curve per quarter, more until they are close enough.
+    num_segments = max(1, math.ceil(abs(sweep_angle) / (math.pi / 2) - 1e-9))
+    while num_segments < 1024 and segment_error(radius, sweep_angle / num_segments) > tolerance:
+        num_segments += 1
+    return num_segments
+
+def get_center_parameters(x1, y1, rx, ry, angle, large_arc, sweep, x2, y2):
+    ''' (cx, cy, rx, ry, cos(phi), sin(phi), start angle, sweep angle) of an arc from x1, y1 to x2, y2; or None if it is
+    a straight line (a radius is 0) or nothing at all (it ends where it starts).
+    '''
+    if x1 == x2 and y1 == y2:
+        return None
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return None
+
+    cos_phi = math.cos(math.radians(angle))
+    sin_phi = math.sin(math.radians(angle))
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    # Radii that are too small to reach from one end to the other are scaled up until they do.
+    radii_check = (x1p * x1p) / (rx * rx) + (y1p * y1p) / (ry * ry)
+    if radii_check > 1:
+        scale = math.sqrt(radii_check)
+        rx, ry = rx * scale, ry * scale
+
+    numerator = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    denominator = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    factor = math.sqrt(max(0.0, numerator / denominator))
+    if bool(large_arc) == bool(sweep):
+        factor = -factor
+    cxp = factor * rx * y1p / ry
+    cyp = -factor * ry * x1p / rx
+
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    start_angle = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    end_angle = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    sweep_angle = end_angle - start_angle
+    if sweep and sweep_angle < 0:
+        sweep_angle += 2 * math.pi
+    elif not sweep and sweep_angle > 0:
+        sweep_angle -= 2 * math.pi
+
+    return (cx, cy, rx, ry, cos_phi, sin_phi, start_angle, sweep_angle)
+
+def arcs_to_cubics(arcs, tolerance=default_arc_tolerance):
+    ''' 'arcs' is a list of (x1, y1, rx, ry, x axis rotation, large arc flag, sweep flag, x2, y2), i.e. the start point
+    followed by the arguments of an absolute A command. Returns, for every arc, the coordinates of the curves for it:
+    a flat list of cp1x, cp1y, cp2x, cp2y, x, y for each curve, an empty list if the arc is nothing and None if it
+    is a straight line to x2, y2.
+    '''
+    if numpy is not None and len(arcs) >= min_numpy_arcs:
+        return arcs_to_cubics_numpy(arcs, tolerance)
+    return arcs_to_cubics_python(arcs, tolerance)
+
+# Below this many arcs, NumPy takes more time to set up than it saves.
+min_numpy_arcs = 16
+
+def arcs_to_cubics_python(arcs, tolerance=default_arc_tolerance):
+    # arcs_to_cubics(), one arc at a time.
+    parameters = [get_center_parameters(*arc) for arc in arcs]
+
+    result = []
+    for arc, arc_parameters in zip(arcs, parameters):
+        if arc_parameters is None:
+            x1, y1, x2, y2 = arc[0], arc[1], arc[7], arc[8]
+            result.append([] if (x1 == x2 and y1 == y2) else None)
+            continue
+
+        cx, cy, rx, ry, cos_phi, sin_phi, start_angle, sweep_angle = arc_parameters
+        num_segments = get_num_segments(max(rx, ry), sweep_angle, tolerance)
+        segment_angle = sweep_angle / num_segments
+        # The control points are this far along the tangents, in the unit circle.
+        kappa = 4 / 3 * math.tan(segment_angle / 4)
+
+        # The points on the unit circle at the ends of the segments, and from those the control points; then all
+        # of them to the ellipse.
+        angles = [start_angle + index * segment_angle for index in range(num_segments + 1)]
+        cosines = [math.cos(value) for value in angles]
+        sines = [math.sin(value) for value in angles]
+        unit_points = []
+        for index in range(num_segments):
+            cos1, sin1, cos2, sin2 = cosines[index], sines[index], cosines[index + 1], sines[index + 1]
+            unit_points.extend((
+                cos1 - kappa * sin1, sin1 + kappa * cos1,
+                cos2 + kappa * sin2, sin2 - kappa * cos2,
+                cos2, sin2,
+            ))
+
+        a, b, c, d = rx * cos_phi, rx * sin_phi, -ry * sin_phi, ry * cos_phi
+        us = unit_points[0::2]
+        vs = unit_points[1::2]
+        coordinates = [0.0] * len(unit_points)
+        coordinates[0::2] = [a * u + c * v + cx for u, v in zip(us, vs)]
+        coordinates[1::2] = [b * u + d * v + cy for u, v in zip(us, vs)]
+        # Exactly at the end point, not wherever rounding puts it.
+        coordinates[-2], coordinates[-1] = arc[7], arc[8]
+        result.append(coordinates)
+
+    return result
+
+def arcs_to_cubics_numpy(arcs, tolerance=default_arc_tolerance):
+    ''' arcs_to_cubics() with NumPy: the same steps as get_center_parameters(), get_num_segments() and
+    arcs_to_cubics_python(), each for all arcs at once. Then the same for all segments of all arcs, which are in one
+    array, the segments of each arc one after the other.
+    '''
+    x1, y1, rx, ry, angle, large_arc, sweep, x2, y2 = numpy.array(arcs, dtype=numpy.float64).reshape(-1, 9).T
+    rx, ry = numpy.abs(rx), numpy.abs(ry)
+    # Arcs that are nothing at all or straight lines (see get_center_parameters()) are left out from here on.
+    is_nothing = (x1 == x2) & (y1 == y2)
+    is_arc = ~is_nothing & (rx != 0) & (ry != 0)
+    x1, y1, rx, ry, angle, large_arc, sweep, x2, y2 = (values[is_arc] for values in (x1, y1, rx, ry, angle, large_arc, sweep, x2, y2))
+
+    # The center parameterization
+    cos_phi = numpy.cos(numpy.radians(angle))
+    sin_phi = numpy.sin(numpy.radians(angle))
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    radii_check = (x1p * x1p) / (rx * rx) + (y1p * y1p) / (ry * ry)
+    scale = numpy.where(radii_check > 1, numpy.sqrt(numpy.maximum(radii_check, 1.0)), 1.0)
+    rx, ry = rx * scale, ry * scale
+
+    numerator = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    denominator = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    factor = numpy.sqrt(numpy.maximum(0.0, numerator / denominator))
+    factor = numpy.where((large_arc != 0) == (sweep != 0), -factor, factor)
+    cxp = factor * rx * y1p / ry
+    cyp = -factor * ry * x1p / rx
+
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    start_angle = numpy.arctan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    end_angle = numpy.arctan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    sweep_angle = end_angle - start_angle
+    sweep_angle = numpy.where((sweep != 0) & (sweep_angle < 0), sweep_angle + 2 * math.pi, sweep_angle)
+    sweep_angle = numpy.where((sweep == 0) & (sweep_angle > 0), sweep_angle - 2 * math.pi, sweep_angle)
+
+    # The number of segments of every arc: one more for each arc that isn't close enough yet, until they all are.
+    radius = numpy.maximum(rx, ry)
+    num_segments = numpy.maximum(1, numpy.ceil(numpy.abs(sweep_angle) / (math.pi / 2) - 1e-9)).astype(numpy.int64)
+    while True:
+        quarter_angle = sweep_angle / num_segments / 4
+        sin, cos = numpy.sin(quarter_angle), numpy.cos(quarter_angle)
+        too_far = (num_segments < 1024) & (radius * 4 / 27 * sin ** 6 / (cos * cos) > tolerance)
+        if not too_far.any():
+            break
+        num_segments += too_far
+
+    # All segments of all arcs, by the arc they are in and their index in that arc.
+    segment_angle = sweep_angle / num_segments
+    kappa = 4 / 3 * numpy.tan(segment_angle / 4)
+    segment_arcs = numpy.repeat(numpy.arange(len(num_segments)), num_segments)
+    first_segments = numpy.cumsum(num_segments) - num_segments
+    indices = numpy.arange(len(segment_arcs)) - first_segments[segment_arcs]
+
+    segment_start_angle = start_angle[segment_arcs]
+    segment_step = segment_angle[segment_arcs]
+    angle1 = segment_start_angle + indices * segment_step
+    angle2 = segment_start_angle + (indices + 1) * segment_step
+    cos1, sin1, cos2, sin2 = numpy.cos(angle1), numpy.sin(angle1), numpy.cos(angle2), numpy.sin(angle2)
+    segment_kappa = kappa[segment_arcs]
+    # The control points and end point of every segment on the unit circle, then on the ellipse.
+    us = numpy.stack((cos1 - segment_kappa * sin1, cos2 + segment_kappa * sin2, cos2), axis=1)
+    vs = numpy.stack((sin1 + segment_kappa * cos1, sin2 - segment_kappa * cos2, sin2), axis=1)
+
+    a, b, c, d = rx * cos_phi, rx * sin_phi, -ry * sin_phi, ry * cos_phi
+    coordinates = numpy.empty((len(segment_arcs), 6))
+    coordinates[:, 0::2] = a[segment_arcs, None] * us + c[segment_arcs, None] * vs + cx[segment_arcs, None]
+    coordinates[:, 1::2] = b[segment_arcs, None] * us + d[segment_arcs, None] * vs + cy[segment_arcs, None]
+    # Exactly at the end point, not wherever rounding puts it.
+    last_segments = first_segments + num_segments - 1
+    coordinates[last_segments, 4] = x2
+    coordinates[last_segments, 5] = y2
+
+    flat_coordinates = coordinates.ravel().tolist()
+    result = []
+    arc_index = 0
+    for arc, nothing, converted in zip(arcs, is_nothing.tolist(), is_arc.tolist()):
+        if not converted:
+            result.append([] if nothing else None)
+            continue
+        first = int(first_segments[arc_index]) * 6
+        result.append(flat_coordinates[first:first + int(num_segments[arc_index]) * 6])
+        arc_index += 1
+    return result
@@ -0,0 +1,536 @@
+import inkex
+
+import os
+import typing
+
+from .model import Part, Path, CloneDefinition, clean_name, ConvertOptions, DesignResult
+from .scaling import Scaling
+from .output import render_design
+from .index import DocumentIndex
+from .transforms import TransformCache, get_transform_within, get_user_unit_transform, get_max_scale, transform_path
+from .shapes import PathDataCache, ShapeError, element_paths
+from .arcs import default_arc_tolerance
+from .pathdata import (PathData, MOVE, LINE, HORZ, VERT, CURVE, SMOOTH, QUADRATIC, TEPID_QUADRATIC, CLOSE, command_names,
+    format_command, make_absolute)
+
+svg_use_tag = inkex.addNS('use', 'svg')
+href_attrib_name = inkex.addNS('href', 'xlink')
+namedview_tag = inkex.addNS('namedview', 'sodipodi')
+document_units_attrib_name = inkex.addNS('document-units', 'inkscape')
+
+# The commands after which a smooth cubic (S/s) resp. quadratic (T/t) curve starts with a reflected control point.
+cubic_command_codes = {CURVE, SMOOTH}
+quadratic_command_codes = {QUADRATIC, TEPID_QUADRATIC}
+
+# The points functions of the CommandKind's below. They get the (absolute) arguments of a command, the current point
+# and the point a smooth curve starts with, and return the coordinates of the points the command adds (x, y, x, y, ...)
+# and the point a next smooth curve starts with, if any.
+
+def end_point(args, pen, control):
+    return (args, None)
+
+def horz_end_point(args, pen, control):
+    return ((args[0], pen[1]), None)
+
+def vert_end_point(args, pen, control):
+    return ((pen[0], args[0]), None)
+
+def curve_points(args, pen, control):
+    # A next smooth curve starts with the reflection of the second control point in the end point.
+    cp1_x, cp1_y, cp2_x, cp2_y, ep_x, ep_y = args
+    return (args, (2 * ep_x - cp2_x, 2 * ep_y - cp2_y))
+
+def smooth_points(args, pen, control):
+    return curve_points((*control, *args), pen, control)
+
+def quadratic_points(args, pen, control):
+    # A quadratic Bezier curve is a cubic one with control points 2/3 of the way from the ends to its control point.
+    control_x, control_y, ep_x, ep_y = args
+    pen_x, pen_y = pen
+    return ((pen_x + 2 / 3 * (control_x - pen_x), pen_y + 2 / 3 * (control_y - pen_y),
+        ep_x + 2 / 3 * (control_x - ep_x), ep_y + 2 / 3 * (control_y - ep_y),
+        ep_x, ep_y), (2 * ep_x - control_x, 2 * ep_y - control_y))
+
+def tepid_quadratic_points(args, pen, control):
+    return quadratic_points((*control, *args), pen, control)
+
+class CommandKind():
+    ''' How an absolute path command becomes FS code (see Converter.path_to_code()): the names of the points it adds
+    (the suffixes after the point number), the code it adds to the Path with those names, and the function that gives
+    their coordinates (see end_point() and friends). After one of the commands in smooth_after, that function gets the
+    control point reflected by the previous command, otherwise the current point. A move starts a subpath; a close
+    has no points and goes back to where its subpath started.
+    '''
+    def __init__(self, suffixes, path_template, points, smooth_after=frozenset(), starts_subpath=False, closes_subpath=False):
+        self.suffixes = suffixes
+        self.path_template = path_template
+        self.points = points
+        self.smooth_after = smooth_after
+        self.starts_subpath = starts_subpath
+        self.closes_subpath = closes_subpath
+
+curve_suffixes = ("_cp1", "_cp2", "_ep")
+# We can safely chain here, because there's always an m or M before this.
+curve_template = (
+    "    .curve(\n"
+    "        points.{0},\n"
+    "        points.{1},\n"
+    "        points.{2}\n"
+    "    )\n")
+line_template = "    .line(points.{0})\n"
+
+# The CommandKind of every command, by command code (see pathdata.command_types), None for the ones that aren't
+# converted. Only absolute commands have one: path_to_code() makes relative commands absolute first (see
+# pathdata.make_absolute()), and transforms.transform_path() converts arcs to curves.
+command_kinds = [None] * len(command_names)
+command_kinds[MOVE] = CommandKind(("",), "    .move(points.{0})\n", end_point, starts_subpath=True)
+command_kinds[LINE] = CommandKind(("",), line_template, end_point)
+command_kinds[HORZ] = CommandKind(("",), line_template, horz_end_point)
+command_kinds[VERT] = CommandKind(("",), line_template, vert_end_point)
+command_kinds[CURVE] = CommandKind(curve_suffixes, curve_template, curve_points)
+command_kinds[SMOOTH] = CommandKind(curve_suffixes, curve_template, smooth_points, smooth_after=cubic_command_codes)
+command_kinds[QUADRATIC] = CommandKind(curve_suffixes, curve_template, quadratic_points)
+command_kinds[TEPID_QUADRATIC] = CommandKind(curve_suffixes, curve_template, tepid_quadratic_points, smooth_after=quadratic_command_codes)
+# Back to the start of the subpath, with a line to the point that is already there.
+command_kinds[CLOSE] = CommandKind((), line_template, None, closes_subpath=True)
+
+def format_coordinate(value, number_format):
+    # The value formatted with number_format (e.g. ".4f"), without trailing zeros, nor a point without decimals.
+    formatted = format(value, number_format)
+    if '.' in formatted:
+        formatted = formatted.rstrip('0').rstrip('.')
+    return formatted
+
+class Converter():
+    ''' Converts the paths in an SVG document to FreeSewing code. Keeps state while converting, so use one instance at
+    a time.
+    '''
+    def __init__(self, options, msg_func):
+        self.options = options
+        self.msg = msg_func
+        self.index = None
+        self.transforms = TransformCache()
+        self.path_data = PathDataCache()
+        # Arcs become curves that are at most this far from them.
+        self.arc_tolerance = getattr(options, 'arc_tolerance', default_arc_tolerance)
+        # The CloneDefinition of every element that is cloned, by element. Kept as long as the index.
+        self.clone_definitions = {}
+        # The fs names of all definitions made, kept as long as the definitions (or longer in streaming mode, which
+        # forgets the definitions of part layers, so that names are handed out the same way in both).
+        self.clone_fs_names = set()
+        # Whether to draw clones with the code of their definition, transformed, instead of with a helper module. For
+        # code that isn't part of a design, so that has no helper modules.
+        self.expand_clones = False
+
+        # The SVG elements that are converted, by tag: paths and basic shapes (see shapes.element_paths), and clones.
+        # Anything else (text, images, groups, ...) is skipped.
+        self.element_dispatch_table = dict.fromkeys(element_paths, self.handle_path_element)
+        self.element_dispatch_table.update({
+            svg_use_tag: self.handle_use_element,
+            # Documents without the SVG namespace
+            'use': self.handle_use_element,
+        })
+
+    def format_coordinate_value(self, coord):
+        return format_coordinate(coord, f".{self.options.fp_precision}f")
+
+    def path_to_code(self, path: PathData):
+        """
+        This function makes JS code that defines a list of points, and then a Path that combines those points.
+        It only returns True or False for success or failure. The actual results are stored in self.points_code
+        and self.path_code.
+        All commands are made absolute first (see pathdata.make_absolute()), then they all go through the same loop,
+        which gets what to do for each from command_kinds. What is the same for every command (the options, the
+        scaling, the start of the point names) is looked up once, before the loop. The debug comments show the
+        commands as they are in the path.
+        The code is collected in lists that are joined once at the end. Adding to a string instead makes this quadratic
+        in the number of nodes.
+        """
+        add_debug_cmts = self.options.show_debug_comments == True
+        number_format = f".{self.options.fp_precision}f"
+        element_id = self.current_element_id
+        point_name_prefix = clean_name(f"{element_id}_p")
+        scale_factors = self.scaling.format_scale_factors(element_id)
+        scale_x, scale_y = (f" * {scale_factors[0]}", f" * {scale_factors[1]}") if scale_factors is not None else ("", "")
+
+        points_fragments = [f"// Path: {element_id}\n", self.scaling.format_points_preamble(element_id)]
+        path_fragments = ["paths." + clean_name(element_id) + " = new Path()\n"]
+        add_points = points_fragments.append
+        add_path = path_fragments.append
+
+        point_counter = 1
+        pen = (0.0, 0.0)
+        # The first point of the current subpath, where closing it goes back to
+        start_name, start = None, pen
+        # The control point a smooth curve right after the previous command starts with
+        reflected = None
+        previous_code = None
+
+        # The commands as they are in the path, for the debug comments
+        source_commands = iter(path) if add_debug_cmts else None
+        for code, args in make_absolute(path):
+            # code is a command code, args its arguments; see pathdata.PathData.
+            if add_debug_cmts:
+                source_code, source_args = next(source_commands)
+                command = format_command(source_code, source_args)
+                add_points(f"// {command}\n")
+                add_path(f"    // inkex.paths.{command_names[source_code]}: {command}\n")
+
+            kind = command_kinds[code]
+            if kind is None:
+                self.msg(f"Unknown path command: {command_names[code]}")
+            elif kind.closes_subpath:
+                if start_name is None:
+                    # Nothing to go back to, and a line to nowhere breaks the whole pattern file.
+                    self.msg(f"Path '{element_id}' closes a subpath before it starts one, skipped the close.")
+                else:
+                    add_path(kind.path_template.format(start_name))
+                    pen = start
+            else:
+                coordinates, reflected = kind.points(args, pen, reflected if previous_code in kind.smooth_after else pen)
+                name = f"{point_name_prefix}{point_counter}"
+                point_counter += 1
+                names = [name + suffix for suffix in kind.suffixes]
+                for index, point_name in enumerate(names):
+                    x = format_coordinate(coordinates[2 * index], number_format)
+                    y = format_coordinate(coordinates[2 * index + 1], number_format)
+                    add_points(f"points.{point_name} = new Point({x}{scale_x}, {y}{scale_y})\n")
+                add_path(kind.path_template.format(*names))
+                pen = (coordinates[-2], coordinates[-1])
+                if kind.starts_subpath:
+                    start_name, start = names[0], pen
+            previous_code = code
+
+        self.points_code = ''.join(points_fragments)
+        self.path_code = ''.join(path_fragments)
+
+        return True
+
+    def extract_text(self, text_element):
+        # Start with the text directly in the <text> element, if any
+        combined_text = (text_element.text or "").strip()
+
+        # Add the text from any <tspan> children, if they exist
+        for tspan in text_element.findall('{http://www.w3.org/2000/svg}tspan'):
+            combined_text += (tspan.text or "").strip()
+
+        # Also consider any tail text following <tspan> elements
+        for tspan in text_element.getchildren():
+            if tspan.tail is not None:
+                combined_text += tspan.tail.strip()
+
+        return combined_text
+
+    def get_index(self, root):
+        # The DocumentIndex of root, made on first use and then shared by all lookups in it.
+        if self.index is None or self.index.root is not root:
+            self.index = DocumentIndex(root)
+            self.transforms.clear()
+            self.path_data.clear()
+            namedview = root.find(namedview_tag)
+            document_units = namedview.get(document_units_attrib_name) if namedview is not None else None
+            self.transforms.root_transform = get_user_unit_transform(root, document_units)
+            self.clone_definitions.clear()
+            self.clone_fs_names.clear()
+        return self.index
+
+    def get_element_by_id(self, element_id):
+        # Through the index of the document being converted. convert_streaming() replaces this with its own lookup.
+        return self.index.get_element_by_id(element_id) if self.index is not None else None
+
+    def parse_metadata(self, root):
+        index = self.get_index(root)
+        metadata_layer = index.get_layer("metadata")
+        name_elements = index.get_texts_in(metadata_layer, "design-name") if metadata_layer is not None else []
+        return self.parse_metadata_layer(root.name, metadata_layer, name_elements)
+
+    def parse_metadata_layer(self, document_name, metadata_layer, name_elements):
+        # The design name is the text of the first of name_elements, the texts labeled 'design-name' in the metadata
+        # layer. Without those it is derived from the document's (file) name.
+        if document_name is None or document_name == "":
+            design_name = "newDesign"
+        else:
+            base_name = os.path.basename(document_name)
+            file_name, file_extension = os.path.splitext(base_name)
+            design_name = file_name
+
+        if metadata_layer is not None:
+            if len(name_elements) > 0:
+                design_name = self.extract_text(name_elements[0])
+            else:
+                self.msg(f"No text element with label 'design-name' found in layer 'metadata', using design name of '{design_name}'.")
+        else:
+            self.msg(f"No layer 'metadata' found in which to look for a text element with label 'design-name', using design name of '{design_name}'.")
+
+        return (design_name,)
+
+    def extract_paths(self, root_element) -> typing.Optional[typing.List[Path]]:
+        # Looks for 'paths' inside the give root_element. root_element is most likely a layer or other type of SVG group
+        # (<g>).
+        return self.extract_paths_from(root_element.iter())
+
+    def get_path(self, element):
+        # The PathData of a path or basic shape, or None if it has none or can't be converted (with a message why).
+        try:
+            return self.path_data.get_path(element)
+        except ShapeError as e:
+            self.msg(str(e))
+            return None
+
+    def handle_path_element(self, element):
+        # Paths and basic shapes. Shapes without a size aren't drawn, so have no path.
+        path = self.get_path(element)
+        if path is None:
+            return
+
+        # The coordinates in the code are those of the document, so apply the transforms of the element and everything
+        # it is in.
+        path = transform_path(path, self.transforms.get_transform(element), self.arc_tolerance)
+        # Is this a reference path, i.e. does it indicate a reference measurement?
+        # There can be max two.
+        label_attrib_name = f"{{{element.nsmap['inkscape']}}}label"
+        if label_attrib_name in element.attrib:
+            elem_label = element.attrib[label_attrib_name]
+            if self.scaling.init_from_label(elem_label, path):
+                return
+
+        self.elements_to_convert.append((element, path))
+
+    def get_referenced_element(self, use_element):
+        # The element a clone refers to, or None if it isn't there.
+        href = use_element.get(href_attrib_name) or use_element.get('href')
+        if href is None or not href.startswith('#'):
+            return None
+        return self.get_element_by_id(href[1:])
+
+    def get_clone_offset(self, use_element):
+        # A clone's own transform is followed by a translation over its x and y.
+        return inkex.Transform(translate=(use_element.to_dimensionless(use_element.get('x', 0)), use_element.to_dimensionless(use_element.get('y', 0))))
+
+    def get_clone_definition(self, element, cloning=()):
+        ''' The CloneDefinition of element, made the first time it is cloned. Clones inside it are included, with the
+        paths of what they refer to. 'cloning' are the elements whose definitions are being made, to catch clones
+        that refer to themselves.
+        '''
+        definition = self.clone_definitions.get(element)
+        if definition is not None:
+            return definition
+
+        cloning = (*cloning, element)
+        items = []
+        for descendant in element.iter():
+            tag = descendant.tag
+            if tag in element_paths:
+                path = self.get_path(descendant)
+                if path is not None:
+                    items.append((descendant.get_id(), path, get_transform_within(descendant, element)))
+            elif tag == svg_use_tag or tag == 'use':
+                referenced = self.get_referenced_element(descendant)
+                if referenced is None or referenced in cloning:
+                    self.msg(f"Clone '{descendant.get_id()}' in '{element.get_id()}' refers to an element that doesn't exist or contains the clone, skipped.")
+                    continue
+                transform = get_transform_within(descendant, element) @ self.get_clone_offset(descendant)
+                for item_id, path, item_transform in self.get_clone_definition(referenced, cloning).items:
+                    items.append((f"{descendant.get_id()}_{item_id}", path, transform @ item_transform))
+
+        definition = CloneDefinition(element.get_id(), items, self.get_clone_fs_name(element.get_id()))
+        self.clone_definitions[element] = definition
+        return definition
+
+    def get_clone_fs_name(self, definition_id):
+        # The name for the helper module of a new definition. Different ids can be the same once cleaned (e.g.
+        # 'button-1' and 'button_1'), then a counter is added to the later ones.
+        fs_name = clean_name(definition_id)
+        unique_fs_name = fs_name
+        counter = 2
+        while unique_fs_name in self.clone_fs_names:
+            unique_fs_name = f"{fs_name}_{counter}"
+            counter += 1
+        self.clone_fs_names.add(unique_fs_name)
+        return unique_fs_name
+
+    def handle_use_element(self, element):
+        # A clone. The element it refers to (a <symbol>, path, group, ...) is converted only once, for all clones of
+        # it; the clones are that, transformed.
+        referenced = self.get_referenced_element(element)
+        if referenced is None:
+            self.msg(f"Clone '{element.get_id()}' refers to an element that doesn't exist, skipped.")
+            return
+
+        definition = self.get_clone_definition(referenced)
+        transform = self.transforms.get_transform(element) @ self.get_clone_offset(element)
+        self.elements_to_convert.append((element, (definition, transform)))
+
+    def clone_to_paths(self, element, definition, transform):
+        # The Path's for a clone: a single one that calls the helper module of the definition, or with expand_clones,
+        # one for every path of the definition.
+        paths = []
+        clone_id = element.get_id()
+
+        if self.expand_clones:
+            for item_id, path, item_transform in definition.items:
+                self.current_element_id = f"{clone_id}_{item_id}"
+                self.path_to_code(transform_path(path, transform @ item_transform, self.arc_tolerance))
+
+                new_path = Path(self.current_element_id)
+                new_path.points_code = self.points_code
+                new_path.path_code = self.path_code
+                paths.append(new_path)
+            return paths
+
+        definition_fs_name = definition.get_fs_name()
+        # The code of the definition is made with the part (see make_part()), once the clone that enlarges it the most
+        # is known.
+        self.used_clone_definitions[definition] = max(self.used_clone_definitions.get(definition, 0.0), get_max_scale(transform))
+        # The translation is in mm like the coordinates, but the rest of the matrix scales and rotates the whole clone,
+        # so it isn't rounded to the precision of the coordinates. To 15 decimals, which is as precise as they get, but
+        # leaves out the rounding errors of e.g. cos(90) that would make 0 something like 6.123233995736766e-17.
+        matrix = ", ".join([*(format_coordinate(value, ".15f") for value in (transform.a, transform.b, transform.c, transform.d)),
+            *(self.format_coordinate_value(value) for value in (transform.e, transform.f))])
+        scale_factors = self.scaling.format_scale_factors(clone_id)
+        scale_arguments = f", {scale_factors[0]}, {scale_factors[1]}" if scale_factors is not None else ""
+
+        new_path = Path(clone_id)
+        new_path.imports = f"import {{ draft_clone_{definition_fs_name} }} from './clone_{definition_fs_name}.mjs'\n"
+        new_path.points_code = f"// Path: {clone_id}, a clone of {definition.id}\n{self.scaling.format_points_preamble(clone_id)}"
+        new_path.path_code = f"draft_clone_{definition_fs_name}(Path, Point, paths, points, '{clean_name(clone_id)}', [{matrix}]{scale_arguments})\n"
+        paths.append(new_path)
+        return paths
+
+    def definition_to_code(self, definition, max_scale):
+        # The code of a definition is the same for all clones, which scale it themselves, so it's made without scaling.
+        # The clones transform the curves of arcs too, so those are made closer to the arcs by max_scale, the most any
+        # of the clones enlarges the definition; then they are within arc_tolerance in all clones.
+        arc_tolerance = self.arc_tolerance / max(max_scale, 1e-12)
+        code = definition.codes.get(arc_tolerance)
+        if code is not None:
+            return code
+
+        scaling = self.scaling
+        self.scaling = Scaling(self.msg)
+
+        code = []
+        for item_id, path, item_transform in definition.items:
+            self.current_element_id = item_id
+            self.path_to_code(transform_path(path, item_transform, arc_tolerance))
+            code.append(f"{self.points_code}\n{self.path_code}")
+        code = definition.codes[arc_tolerance] = "\n".join(code)
+
+        self.scaling = scaling
+        return code
+
+    def extract_paths_from(self, elements) -> typing.Optional[typing.List[Path]]:
+        # Like extract_paths(), for the given elements only; they aren't descended into.
+        # Elements are handled according to their tag through self.element_dispatch_table, the same way path commands
+        # are through command_kinds.
+        paths = [] # return value
+
+        self.scaling = Scaling(self.msg)
+
+        # Converting needs the scaling, which can be defined by any of the paths (paths with a specific label). So in
+        # one go over the elements, set up the scaling from those reference paths and collect the others together with
+        # their parsed path data, then convert the collected ones.
+        self.elements_to_convert = []
+        self.used_clone_definitions = {}
+        get_element_handler = self.element_dispatch_table.get
+        for element in elements:
+            handler = get_element_handler(element.tag)
+            if handler is not None:
+                handler(element)
+
+        # @todo Some way to check that if a reference object was found, it was valid?
+
+        #self.msg(f"Using scaling mode {self.scaling_mode}")
+        #self.msg(f"Parameters: {self.scaling}")
+
+        for element, path in self.elements_to_convert:
+            if isinstance(path, tuple):
+                paths.extend(self.clone_to_paths(element, *path))
+                continue
+
+            self.current_element_id = element.get_id()
+
+            if not self.path_to_code(path):
+                self.msg("path_to_code failed. Unsure what to do. Probably critical bug.")
+                continue
+
+            new_path = Path(self.current_element_id)
+            new_path.points_code = self.points_code
+            new_path.path_code = self.path_code
+
+            paths.append(new_path)
+
+        return paths
+
+    def extract_parts(self, design_name, root):
+        # Extract all FS parts, which are part layers (see index.get_part_name()). Part layers can be nested; every
+        # element belongs to the nearest part layer it is in, so that nothing is converted for more than one part.
+        parts = [] # return value
+        for part_name, part_elements in self.get_index(root).part_layers:
+            #self.msg(f"Found Freeswing part layer with name {part_name}")
+            parts.append(self.make_part(part_name, part_elements))
+
+        return parts
+
+    def make_part(self, part_name, part_elements):
+        new_part = Part(part_name)
+        new_part.paths = self.extract_paths_from(part_elements)
+        new_part.clone_definitions = [(definition, self.definition_to_code(definition, max_scale)) for definition, max_scale in self.used_clone_definitions.items()]
+        new_part.measurements = self.scaling.measurements
+        new_part.options = self.scaling.options
+        return new_part
+
+    def extract_code_for_selection(self, elements):
+        # There are no helper modules for the clones here.
+        self.expand_clones = True
+
+        points_code = []
+        path_code = []
+
+        for element in elements:
+            paths = self.extract_paths(element)
+            for path in paths:
+                points_code.append(f"{path.points_code}\n")
+                path_code.append(f"{path.path_code}\n")
+
+        return f"{''.join(points_code)}\n{''.join(path_code)}\n"
+
+def load_document(document):
+    ''' Get the root element of an SVG document. 'document' can be the SVG source (str or bytes), a filename, a file
+    object or an already parsed tree or root element. Trees have to be parsed by inkex (inkex.load_svg()), so that the
+    elements have the inkex element types.
+    '''
+    if isinstance(document, inkex.SvgDocumentElement):
+        return document
+    if hasattr(document, 'getroot'):
+        return document.getroot()
+    return inkex.load_svg(document).getroot()
+
+def convert(document, options=None, msg=None) -> DesignResult:
+    ''' Convert a complete document to a design, in memory. See load_document() for what 'document' can be. 'msg' is
+    called with any warnings; if not given, they are collected in DesignResult.messages.
+    '''
+    messages = []
+    converter = Converter(options if options is not None else ConvertOptions(), msg if msg is not None else messages.append)
+
+    root = load_document(document)
+
+    # Get metadata, if there is any.
+    design_name, *placeholder = converter.parse_metadata(root)
+
+    # Derive part definitions from layer structure.
+    parts = converter.extract_parts(design_name, root)
+
+    direct_emitter = getattr(converter.options, 'direct_emitter', True)
+    return DesignResult(design_name, parts, render_design(design_name, parts, direct_emitter), messages)
+
+def convert_selection(document, element_ids, options=None, msg=None) -> str:
+    ''' Convert only the elements with the given id's, and return the points and path code for them as one string.
+    '''
+    converter = Converter(options if options is not None else ConvertOptions(), msg if msg is not None else (lambda message: None))
+
+    root = load_document(document)
+    index = converter.get_index(root)
+    elements = [index.get_element_by_id(element_id) for element_id in element_ids]
+
+    return converter.extract_code_for_selection([element for element in elements if element is not None])
@@ -0,0 +1,234 @@
+''' Optional long running conversion server, so that the work of starting Python and importing everything is done once
+instead of every time the extension is applied in Inkscape. Start it with
+
+    python -m to_freesewing_js.daemon
+
+from the 'extension' directory (or with that directory on the Python path). The extension will then send its document to
+the server and only write out the results. When no server is running, the extension does the conversion itself.
+
+The protocol is deliberately simple: the client connects to a Unix domain socket and sends one request, the server sends
+one response and closes the connection. Both are a JSON header followed by a binary payload, each preceded by its
+length as a 4 byte big endian unsigned integer. The payload of a request is the SVG document; responses have an empty
+payload.
+'''
+
+import sys, os
+import argparse
+import getpass
+import json
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+
+from .model import ConvertOptions, DesignResult
+from .output import FileExistsBehaviour, SourceFile, is_inside_design
+
+PROTOCOL_VERSION = 2
+
+def default_socket_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"to-freesewing-js-{getpass.getuser()}.sock")
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX')
+
+def recv_exactly(sock, num_bytes):
+    chunks = []
+    while num_bytes > 0:
+        chunk = sock.recv(min(num_bytes, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Connection closed before the complete message was received.")
+        chunks.append(chunk)
+        num_bytes -= len(chunk)
+    return b''.join(chunks)
+
+def send_message(sock, header: dict, payload: bytes = b''):
+    header_bytes = json.dumps(header).encode('utf-8')
+    sock.sendall(struct.pack('>I', len(header_bytes)) + header_bytes + struct.pack('>I', len(payload)))
+    if payload:
+        sock.sendall(payload)
+
+def receive_message(sock):
+    header_length, = struct.unpack('>I', recv_exactly(sock, 4))
+    header = json.loads(recv_exactly(sock, header_length).decode('utf-8'))
+    payload_length, = struct.unpack('>I', recv_exactly(sock, 4))
+    return (header, recv_exactly(sock, payload_length))
+
+def options_to_dict(options):
+    return {
+        'fp_precision': getattr(options, 'fp_precision', 4),
+        'show_debug_comments': getattr(options, 'show_debug_comments', False) == True,
+        'direct_emitter': getattr(options, 'direct_emitter', True),
+        'arc_tolerance': getattr(options, 'arc_tolerance', 0.01),
+    }
+
+def handle_request(header, payload):
+    ''' Does the actual conversion for a request, returns the response header.
+    '''
+    # Not needed by clients, so only imported here.
+    from .converter import convert, convert_selection
+
+    if header.get('version') != PROTOCOL_VERSION:
+        return {'error': f"Unsupported protocol version {header.get('version')}, expected {PROTOCOL_VERSION}."}
+
+    options = ConvertOptions(**header.get('options', {}))
+    messages = []
+
+    if header.get('export_what') == "ping":
+        return {}
+    elif header.get('export_what') == "all":
+        result = convert(payload, options, msg=messages.append)
+        return {
+            'design_name': result.design_name,
+            'sources': [
+                {'path': source.path, 'code': source.code, 'file_exists_behaviour': source.file_exists_behaviour.name}
+                for source in result.sources
+            ],
+            'messages': messages,
+        }
+    elif header.get('export_what') == "selection":
+        code = convert_selection(payload, header.get('element_ids', []), options, msg=messages.append)
+        return {'code': code, 'messages': messages}
+    else:
+        return {'error': f"Unknown value for export_what: {header.get('export_what')}"}
+
+class ConversionRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, payload = receive_message(self.request)
+            response = handle_request(header, payload)
+        except Exception as e:
+            response = {'error': f"{type(e).__name__}: {e}"}
+        send_message(self.request, response)
+
+def serve(socket_path=None):
+    socket_path = socket_path or default_socket_path()
+
+    if os.path.exists(socket_path):
+        # Either another server is running, or a previous one didn't clean up after itself.
+        if request(socket_path, {'version': PROTOCOL_VERSION, 'export_what': 'ping'}) is not None:
+            raise RuntimeError(f"A server is already listening on {socket_path}.")
+        os.unlink(socket_path)
+
+    # Only the current user may connect.
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, ConversionRequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def is_own_socket(socket_path):
+    # Whether socket_path is a socket of the current user. Without XDG_RUNTIME_DIR it is in the shared temp directory,
+    # where another user could have made it first, to get our documents and send back whatever they like.
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+def is_own_server(sock):
+    # Whether the process at the other end of a connected socket is of the current user, where the platform can tell.
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    pid, uid, gid = struct.unpack('3i', credentials)
+    return uid == os.getuid()
+
+def request(socket_path, header, payload=b''):
+    ''' Send a request to the server. Returns the response header, or None if no server could be reached, or the server
+    isn't of the current user.
+    '''
+    if not is_supported() or not is_own_socket(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+            if not is_own_server(sock):
+                return None
+            # Converting a big document may take a while, don't give up on it.
+            sock.settimeout(None)
+            send_message(sock, header, payload)
+            response, _ = receive_message(sock)
+            return response
+    except (OSError, ValueError):
+        return None
+
+def remote_convert(document: bytes, options=None, msg=None, socket_path=None):
+    ''' Like convert(), but done by the server. Returns None if no server could be reached or the server failed, so the
+    caller can fall back to converting by itself. The parts aren't sent back, so DesignResult.parts is None.
+    '''
+    response = request(socket_path or default_socket_path(), {
+        'version': PROTOCOL_VERSION,
+        'export_what': "all",
+        'options': options_to_dict(options),
+    }, document)
+    if response is None or 'error' in response:
+        return None
+
+    # Only files in the design directory, whatever the server says.
+    if not all(is_inside_design(source['path']) for source in response['sources']):
+        return None
+
+    messages = response.get('messages', [])
+    if msg is not None:
+        for message in messages:
+            msg(message)
+
+    sources = [
+        SourceFile(source['path'], source['code'], FileExistsBehaviour[source['file_exists_behaviour']])
+        for source in response['sources']
+    ]
+    return DesignResult(response['design_name'], None, sources, messages)
+
+def remote_convert_selection(document: bytes, element_ids, options=None, msg=None, socket_path=None):
+    ''' Like convert_selection(), but done by the server. Returns None if no server could be reached or the server
+    failed.
+    '''
+    response = request(socket_path or default_socket_path(), {
+        'version': PROTOCOL_VERSION,
+        'export_what': "selection",
+        'element_ids': list(element_ids),
+        'options': options_to_dict(options),
+    }, document)
+    if response is None or 'error' in response:
+        return None
+
+    if msg is not None:
+        for message in response.get('messages', []):
+            msg(message)
+
+    return response['code']
+
+def main(argv=None):
+    pars = argparse.ArgumentParser(description="Keep the FreeSewing JS converter loaded and serve conversion requests from the Inkscape extension.")
+    pars.add_argument("--socket", type=str, default=None, help=f"path of the Unix domain socket (default: {default_socket_path()})")
+    options = pars.parse_args(argv)
+
+    if not is_supported():
+        print("Unix domain sockets aren't supported on this platform.", file=sys.stderr)
+        return 1
+
+    socket_path = options.socket or default_socket_path()
+    print(f"Listening on {socket_path}", file=sys.stderr)
+    # Make sure the socket gets removed when we're asked to stop.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve(socket_path)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
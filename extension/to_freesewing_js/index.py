@@ -0,0 +1,98 @@
+''' An index of the things in a document that the conversion looks up: layers and texts by their label, elements by id
+and the elements of every part layer. Made in one walk over the document, so every lookup after that is a dict access
+instead of a search through the document.
+'''
+
+import re
+
+import inkex
+from lxml import etree
+
+from .model import clean_name
+
+svg_g_tag = inkex.addNS('g', 'svg')
+svg_text_tag = inkex.addNS('text', 'svg')
+groupmode_attrib_name = inkex.addNS('groupmode', 'inkscape')
+label_attrib_name = inkex.addNS('label', 'inkscape')
+
+def get_part_name(element):
+    ''' The name of the FS part if element is a part layer (<g> element with inkscape:groupmode="layer" attribute and an
+    inkscape:label attribute starting with 'part:'), None otherwise.
+    '''
+    if element.tag != svg_g_tag or element.get(groupmode_attrib_name) != "layer":
+        return None
+
+    layer_label = element.get(label_attrib_name)
+    if layer_label is None:
+        return None
+
+    str_parts = re.split(r'(?i)part:', layer_label, maxsplit=1)
+    if len(str_parts) <= 1:
+        return None
+    return clean_name(str_parts[1].strip())
+
+class DocumentIndex():
+    ''' Everything is in document order. Part layers can be nested; every element belongs to the nearest part layer
+    it is in, so that nothing is converted for more than one part. The document must not be changed while the index is
+    in use.
+    '''
+    def __init__(self, root):
+        self.root = root
+        self.layers_by_label = {} # label: [layer, ...]
+        self.texts_by_label = {} # label: [text element, ...]
+        self.elements_by_id = {}
+        self.part_layers = [] # (part name, [elements of the part, starting with the layer itself])
+
+        # The part layers the walk is in, innermost last, with their lists of elements.
+        open_part_layers = []
+        part_elements = None
+
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            if event == 'end':
+                if open_part_layers and open_part_layers[-1][0] is element:
+                    open_part_layers.pop()
+                    part_elements = open_part_layers[-1][1] if open_part_layers else None
+                continue
+
+            tag = element.tag
+            if not isinstance(tag, str):
+                # Comments and processing instructions
+                continue
+
+            element_id = element.get('id')
+            if element_id is not None:
+                # With duplicate ids, the first one counts, like for getElementById().
+                self.elements_by_id.setdefault(element_id, element)
+
+            if tag == svg_g_tag:
+                if element.get(groupmode_attrib_name) == "layer":
+                    label = element.get(label_attrib_name)
+                    if label is not None:
+                        self.layers_by_label.setdefault(label, []).append(element)
+
+                    part_name = get_part_name(element)
+                    if part_name is not None:
+                        part_elements = []
+                        open_part_layers.append((element, part_elements))
+                        self.part_layers.append((part_name, part_elements))
+            elif tag == svg_text_tag:
+                label = element.get(label_attrib_name)
+                if label is not None:
+                    self.texts_by_label.setdefault(label, []).append(element)
+
+            if part_elements is not None:
+                part_elements.append(element)
+
+    def get_layer(self, label):
+        ''' The first layer with this label, or None.
+        '''
+        layers = self.layers_by_label.get(label)
+        return layers[0] if layers else None
+
+    def get_texts_in(self, element, label):
+        ''' The text elements with this label inside element.
+        '''
+        return [text for text in self.texts_by_label.get(label, []) if element in text.iterancestors()]
+
+    def get_element_by_id(self, element_id):
+        return self.elements_by_id.get(element_id)
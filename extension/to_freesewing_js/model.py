@@ -0,0 +1,69 @@
+import re
+
+class Part():
+    def __init__(self, name):
+        self.name = name
+        self.paths = []
+        # The CloneDefinition's the paths of this part use, with the code that draws them in this part.
+        self.clone_definitions = []
+        self.measurements = []
+        self.options = []
+
+    def get_fs_name(self):
+        ''' Get filesystem name, i.e. get name in a way that is safe to use in filenames.
+        '''
+        return clean_name(self.name)
+
+class Path():
+    def __init__(self, path_id):
+        self.id = path_id
+        self.points_code = ''
+        self.path_code = ''
+        # Import statements the path's module needs, if any.
+        self.imports = ''
+
+    def get_fs_name(self):
+        return clean_name(self.id)
+
+class CloneDefinition():
+    ''' The element a clone (<use>) refers to, looked up once for all clones of it: 'items' are the (id, path,
+    transform) of every path in it, with the transform from the path to the coordinates of the element. The paths
+    still have their arcs, which become curves only once it's known how much the clones enlarge them. 'codes' is
+    the code that draws the items, by the arc tolerance it was made with (see Converter.definition_to_code()).
+    Clones are drawn by a helper module made from that code, with their own transform. 'fs_name' names the helper
+    module; it's the cleaned id, unless another definition already has that name (see
+    Converter.get_clone_fs_name()).
+    '''
+    def __init__(self, definition_id, items, fs_name=None):
+        self.id = definition_id
+        self.items = items
+        self.codes = {}
+        self.fs_name = fs_name if fs_name is not None else clean_name(definition_id)
+
+    def get_fs_name(self):
+        return self.fs_name
+
+def clean_name(string):
+    return re.sub(r'\W|^(?=\d)', '_', string)
+
+class ConvertOptions():
+    ''' Options for convert() and convert_selection(). Anything with the same attributes works too, like the parsed
+    command line options of the Inkscape extension. direct_emitter may be left out there; see
+    output.emit_path_module(). arc_tolerance is how far (in mm) the curves that arcs are converted to may be
+    from the exact arcs.
+    '''
+    def __init__(self, fp_precision=4, show_debug_comments=False, direct_emitter=True, arc_tolerance=0.01):
+        self.fp_precision = fp_precision
+        self.show_debug_comments = show_debug_comments
+        self.direct_emitter = direct_emitter
+        self.arc_tolerance = arc_tolerance
+
+class DesignResult():
+    ''' Everything convert() made from a document: the design name, the parts with their paths and the rendered
+    sources, plus any messages that were emitted along the way.
+    '''
+    def __init__(self, design_name, parts, sources, messages):
+        self.design_name = design_name
+        self.parts = parts
+        self.sources = sources
+        self.messages = messages
@@ -0,0 +1,211 @@
+import os
+import enum
+import functools
+
+from .templates import indent_filter, get_environment, source_hash
+
+class FileExistsBehaviour(enum.Enum):
+    KEEP_EXISTING = enum.auto()
+    FORCE_OVERWRITE = enum.auto()
+
+class SourceFile():
+    ''' One generated file. 'path' is relative to the design directory. 'code' is either the contents as a string, or
+    a function returning them as an iterable of strings, which is called every time they are needed. The latter lets
+    write_design() stream the contents to the file without ever holding all of them in memory.
+    '''
+    def __init__(self, path, code, file_exists_behaviour):
+        self.path = path
+        self._code = code
+        self.file_exists_behaviour = file_exists_behaviour
+
+    @property
+    def code(self):
+        if callable(self._code):
+            return ''.join(self._code())
+        return self._code
+
+    def chunks(self):
+        if callable(self._code):
+            return self._code()
+        return (self._code,)
+
+def is_inside_design(path):
+    # Whether 'path' stays inside the design directory it is relative to: not absolute, and no '..' in it.
+    return not os.path.isabs(path) and not os.path.splitdrive(path)[0] and '..' not in path.replace('\\', '/').split('/')
+
+def render_template(template_name: str, data: dict = {}):
+    tpl = get_environment().get_template(template_name)
+    return tpl.render(data)
+
+def stream_template(template, data: dict = {}):
+    ''' A function for SourceFile's 'code' that renders 'template' (a name or a Template) in chunks.
+    '''
+    def generate():
+        tpl = get_environment().get_template(template) if isinstance(template, str) else template
+        return tpl.generate(data)
+    return generate
+
+# emit_path_module() produces the exact same output as templates/path.mjs.tpl, without going through Jinja. That adds
+# up for designs with thousands of paths. It was written for the version of the template with this hash, and is only
+# used while the template is unchanged. When changing the template, update emit_path_module() and this hash to match;
+# 'python -m to_freesewing_js.templates' checks that they do.
+direct_emitter_template_hash = '7da3453f587a5ab734bea8b2d7412ac487cf5263686cb85c130eec3313cdb8a2'
+
+@functools.lru_cache(maxsize=None)
+def direct_emitter_is_current():
+    return source_hash('path.mjs.tpl') == direct_emitter_template_hash
+
+def emit_path_module(path_fs_name, points_code, path_code, imports=''):
+    return ''.join(emit_path_module_chunks(path_fs_name, points_code, path_code, imports))
+
+def emit_path_module_chunks(path_fs_name, points_code, path_code, imports=''):
+    return (
+        f"{imports}\n" if imports else "",
+        f"function draft_{path_fs_name}(\n"
+        "  Path,\n"
+        "  Point,\n"
+        "  paths,\n"
+        "  points,\n"
+        "  measurements,\n"
+        "  options,\n"
+        "  utils,\n"
+        "  macro,\n"
+        "  part,\n"
+        ")\n"
+        "{\n",
+        indent_filter(points_code),
+        "\n",
+        indent_filter(path_code),
+        "\n"
+        "}\n"
+        "\n"
+        f"export {{ draft_{path_fs_name} }}",
+    )
+
+def verify_direct_emitter():
+    ''' Check emit_path_module() against the template on a few tricky inputs. Returns a list of descriptions of the
+    inputs for which they differ, so empty if all is well.
+    '''
+    path_template = get_environment().get_template('path.mjs.tpl')
+    samples = [
+        ('empty', '', '', ''),
+        ('regular', "// Path: path1\npoints.path1_p1 = new Point(10, 10)\n", "paths.path1 = new Path()\n    .move(points.path1_p1)\n", ''),
+        ('no trailing newlines', "points.a = new Point(1, 2)", "paths.a = new Path()", ''),
+        ('blank and whitespace-only lines', "\n  \n\t\npoints.b = new Point(1, 2)\n\n \r\n", "\n\n    \n.line(x)\n", ''),
+        ('carriage returns and unicode', "points.c = 1\r\n// caf\u00e9 \u2003\n\u2003\n", "\u00a0\npaths.c\u2028x\n", ''),
+        ('imports', "draft_clone_a(Path, Point, paths, points, 'b', [1, 0, 0, 1, 0, 0])\n", '', "import { draft_clone_a } from './clone_a.mjs'\n"),
+    ]
+    failures = []
+    for description, points_code, path_code, imports in samples:
+        data = {'path_fs_name': 'sample', 'points_code': points_code, 'path_code': path_code, 'imports': imports}
+        if emit_path_module('sample', points_code, path_code, imports) != path_template.render(data):
+            failures.append(description)
+    return failures
+
+def render_design(design_name, parts, direct_emitter=True):
+    ''' Prepare all files that make up a design. Returns a list of SourceFile's, which are rendered when their code is
+    used, so 'parts' must not be changed after this. With direct_emitter, path files are made with emit_path_module()
+    instead of the template, if possible.
+    '''
+    sources = []
+
+    # Look these up once, they're used for every part and path.
+    env = get_environment()
+    part_template = env.get_template('part.mjs.tpl')
+    path_template = env.get_template('path.mjs.tpl')
+    clone_template = env.get_template('clone.mjs.tpl')
+    direct_emitter = direct_emitter and direct_emitter_is_current()
+
+    # index.mjs, the design itself which ties together the parts. Only when it doesn't exist already.
+    sources.append(SourceFile(os.path.join("src", "index.mjs"),
+        stream_template('index.mjs.tpl',
+            {
+                'design_name' : design_name,
+                'parts': parts
+            }
+        ),
+        FileExistsBehaviour.KEEP_EXISTING
+    ))
+
+    # All individual parts. Only when they don't exist already.
+    for part in parts:
+        part_fs_name = part.get_fs_name()
+
+        # The part definition
+        sources.append(SourceFile(os.path.join("src", "parts", part_fs_name, f"{part_fs_name}.mjs"),
+            stream_template(part_template,
+                {
+                    'design_name' : design_name,
+                    'part_name' : part.name,
+                    'paths' : part.paths,
+                    'measurements' : part.measurements,
+                    'options' : part.options,
+                }
+            ),
+            FileExistsBehaviour.KEEP_EXISTING
+        ))
+
+        # The individual path code fragments. Overwrite.
+        for path in part.paths:
+            path_fs_name = path.get_fs_name()
+
+            if direct_emitter:
+                code = functools.partial(emit_path_module_chunks, path_fs_name, path.points_code, path.path_code, path.imports)
+            else:
+                code = stream_template(path_template,
+                    {
+                        'path_fs_name' : path_fs_name,
+                        'points_code' : path.points_code,
+                        'path_code' :  path.path_code,
+                        'imports' : path.imports,
+                    }
+                )
+
+            sources.append(SourceFile(os.path.join("src", "parts", part_fs_name, "paths", f"draft_{path_fs_name}.mjs"), code, FileExistsBehaviour.FORCE_OVERWRITE))
+
+        # The helpers that draw the clones in the part, one for every element that is cloned. Overwrite.
+        for definition, definition_code in part.clone_definitions:
+            definition_fs_name = definition.get_fs_name()
+            code = stream_template(clone_template,
+                {
+                    'definition_id' : definition.id,
+                    'definition_fs_name' : definition_fs_name,
+                    'code' : definition_code,
+                }
+            )
+            sources.append(SourceFile(os.path.join("src", "parts", part_fs_name, "paths", f"clone_{definition_fs_name}.mjs"), code, FileExistsBehaviour.FORCE_OVERWRITE))
+
+    # The contents of the i18n directory if they don't exist yet.
+    sources.append(SourceFile(os.path.join("i18n", "index.mjs"), stream_template('i18n_index.mjs.tpl'), FileExistsBehaviour.KEEP_EXISTING))
+    sources.append(SourceFile(os.path.join("i18n", "en.json"), stream_template('i18n_strings.json.tpl'), FileExistsBehaviour.KEEP_EXISTING))
+
+    return sources
+
+# Rendering yields many small chunks; collect them into larger writes.
+write_buffer_size = 64 * 1024
+
+def write_design(result, output_dir, force_overwrite=False):
+    ''' Write the sources of a DesignResult to the design directory 'output_dir'. Files that are only meant to be
+    generated once (index.mjs, the part definitions, i18n) are left alone if they exist, unless force_overwrite is set.
+    Files are written chunk by chunk as they are rendered, through a buffered file handle.
+    '''
+    os.makedirs(f"{output_dir}", exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "i18n"), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "src"), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "src", "parts"), exist_ok=True)
+
+    # Before writing anything, so a bad result doesn't leave half a design.
+    for source in result.sources:
+        if not is_inside_design(source.path):
+            raise ValueError(f"Not writing {source.path}, it is outside the design directory.")
+
+    for source in result.sources:
+        output_filename = os.path.join(output_dir, source.path)
+        if os.path.isfile(output_filename) and source.file_exists_behaviour == FileExistsBehaviour.KEEP_EXISTING and not force_overwrite:
+            continue
+
+        os.makedirs(os.path.dirname(output_filename), exist_ok=True)
+        with open(output_filename, 'w', buffering=write_buffer_size) as file:
+            file.writelines(source.chunks())
+
+    return True
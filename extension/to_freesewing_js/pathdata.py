@@ -0,0 +1,230 @@
+''' The intermediate representation of path data that everything after parsing works on: a PathData has the commands
+of a path as an array of command codes, and all their arguments in one flat array of floats. That takes a fraction of
+the memory of an inkex.paths.Path, with an object for every command and another for every number in it, and it can be
+worked on one array at a time.
+
+The command codes stand for the commands of SVG path data, relative and absolute (see command_types), and each has the
+same arguments as the inkex.paths command of that type, in the same order. make_absolute() turns the relative commands
+into absolute ones for all of a path at once.
+'''
+
+from array import array
+
+import inkex.paths
+
+# NumPy comes with inkex, but make_absolute() works without it too.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The inkex.paths command type of each command code, i.e. the code of a command is its index in here.
+command_types = [
+    inkex.paths.Move, inkex.paths.move,
+    inkex.paths.Line, inkex.paths.line,
+    inkex.paths.Horz, inkex.paths.horz,
+    inkex.paths.Vert, inkex.paths.vert,
+    inkex.paths.Curve, inkex.paths.curve,
+    inkex.paths.Smooth, inkex.paths.smooth,
+    inkex.paths.Quadratic, inkex.paths.quadratic,
+    inkex.paths.TepidQuadratic, inkex.paths.tepidQuadratic,
+    inkex.paths.Arc, inkex.paths.arc,
+    inkex.paths.ZoneClose, inkex.paths.zoneClose,
+]
+command_codes = {command_type: code for code, command_type in enumerate(command_types)}
+
+(MOVE, MOVE_REL, LINE, LINE_REL, HORZ, HORZ_REL, VERT, VERT_REL, CURVE, CURVE_REL, SMOOTH, SMOOTH_REL, QUADRATIC,
+    QUADRATIC_REL, TEPID_QUADRATIC, TEPID_QUADRATIC_REL, ARC, ARC_REL, CLOSE, CLOSE_REL) = range(len(command_types))
+
+# By command code: the number of arguments, the letter in SVG path data and the name of the inkex.paths command.
+command_num_args = [command_type.nargs for command_type in command_types]
+command_letters = [command_type.letter for command_type in command_types]
+command_names = [command_type.__name__ for command_type in command_types]
+
+relative_codes = {code for code, command_type in enumerate(command_types) if command_type.letter.islower()}
+arc_codes = {ARC, ARC_REL}
+move_codes = {MOVE, MOVE_REL}
+
+# By command code: the absolute command (which comes right before the relative one in command_types), and for each
+# argument whether it is relative to the x (0) or y (1) coordinate of the current point, or not relative at all (-1).
+# Only the end point of an arc is relative.
+absolute_command_codes = [code - 1 if code in relative_codes else code for code in range(len(command_types))]
+relative_axes = [(-1,) * command_num_args[code] for code in range(len(command_types))]
+for code in relative_codes - arc_codes:
+    relative_axes[code] = (0, 1) * (command_num_args[code] // 2)
+relative_axes[HORZ_REL] = (0,)
+relative_axes[VERT_REL] = (1,)
+relative_axes[ARC_REL] = (-1,) * 5 + (0, 1)
+
+class PathData():
+    ''' The commands of a path ('commands', an array of command codes) and their arguments ('coordinates', an array of
+    floats, in the order of the commands). Arc flags are arguments like any other, 0.0 or 1.0.
+    '''
+    __slots__ = ('commands', 'coordinates')
+
+    def __init__(self, commands=None, coordinates=None):
+        self.commands = commands if commands is not None else array('B')
+        self.coordinates = coordinates if coordinates is not None else array('d')
+
+    @classmethod
+    def from_path(cls, path: inkex.paths.Path):
+        data = cls()
+        data.commands.extend(command_codes[type(command)] for command in path)
+        for command in path:
+            data.coordinates.extend(command.args)
+        return data
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __iter__(self):
+        ''' (command code, arguments) of every command.
+        '''
+        coordinates = self.coordinates
+        offset = 0
+        for code in self.commands:
+            num_args = command_num_args[code]
+            yield (code, coordinates[offset:offset + num_args])
+            offset += num_args
+
+    def end_points(self):
+        ''' The absolute point each command ends at, like inkex.paths.Path.end_points.
+        '''
+        current_x, current_y = 0.0, 0.0
+        start_x, start_y = 0.0, 0.0
+        for code, args in make_absolute(self):
+            if code == CLOSE:
+                current_x, current_y = start_x, start_y
+            elif code == HORZ:
+                current_x = args[0]
+            elif code == VERT:
+                current_y = args[0]
+            else:
+                current_x, current_y = args[-2], args[-1]
+            if code == MOVE:
+                start_x, start_y = current_x, current_y
+            yield (current_x, current_y)
+
+def make_absolute(path: PathData) -> PathData:
+    ''' The path with all relative commands made absolute, i.e. with the current point added to their coordinates. The
+    coordinates are exactly the same as when adding them up one command at a time, the way SVG says; but with NumPy,
+    that's done with a cumulative sum over each stretch of relative commands. Returns path itself if it has no relative
+    commands, so the result must not be changed.
+    '''
+    if relative_codes.isdisjoint(path.commands):
+        return path
+    commands = array('B', bytes(path.commands).translate(absolute_command_table))
+    if numpy is not None and len(path.commands) >= min_numpy_commands:
+        coordinates = make_absolute_numpy(path)
+        if coordinates is not None:
+            return PathData(commands, coordinates)
+    return PathData(commands, make_absolute_python(path))
+
+absolute_command_table = bytes(absolute_command_codes) + bytes(range(len(command_types), 256))
+
+# Below this many commands, NumPy takes more time to set up than it saves.
+min_numpy_commands = 64
+
+def make_absolute_python(path):
+    # The coordinates of make_absolute(), one command at a time.
+    coordinates = array('d', path.coordinates)
+    current_x, current_y = 0.0, 0.0
+    start_x, start_y = 0.0, 0.0
+    offset = 0
+    for code in path.commands:
+        num_args = command_num_args[code]
+        if code in relative_codes:
+            for index, axis in enumerate(relative_axes[code]):
+                if axis == 0:
+                    coordinates[offset + index] += current_x
+                elif axis == 1:
+                    coordinates[offset + index] += current_y
+
+        if code == CLOSE or code == CLOSE_REL:
+            current_x, current_y = start_x, start_y
+        elif code == HORZ or code == HORZ_REL:
+            current_x = coordinates[offset]
+        elif code == VERT or code == VERT_REL:
+            current_y = coordinates[offset]
+        else:
+            current_x, current_y = coordinates[offset + num_args - 2], coordinates[offset + num_args - 1]
+        if code in move_codes:
+            start_x, start_y = current_x, current_y
+        offset += num_args
+    return coordinates
+
+def make_absolute_numpy(path):
+    ''' The coordinates of make_absolute() with NumPy, or None if that isn't worth it for this path.
+
+    For each of x and y, every command either sets the current coordinate (absolute commands, and closing the subpath,
+    which goes back to where it started), adds to it (relative commands) or leaves it as is (e.g. x for V and v). So
+    the current coordinate after every command is a cumulative sum of what they add, starting over at every command
+    that sets it. Then the current point before each command is added to its relative coordinates.
+    '''
+    codes = numpy.frombuffer(path.commands, dtype=numpy.uint8)
+    args = numpy.frombuffer(path.coordinates, dtype=numpy.float64)
+    num_commands = len(codes)
+
+    num_args = numpy_tables.num_args[codes]
+    offsets = numpy.cumsum(num_args) - num_args
+    is_close = numpy_tables.is_close[codes]
+    # The index of the last move up to each command, where a close goes back to.
+    move_indices = numpy.maximum.accumulate(numpy.where(numpy_tables.is_move[codes], numpy.arange(num_commands), -1))
+
+    current = []
+    for end_arg, sets in ((numpy_tables.end_x_arg, numpy_tables.sets_x), (numpy_tables.end_y_arg, numpy_tables.sets_y)):
+        command_end_arg = end_arg[codes]
+        has_end = command_end_arg >= 0
+        steps = numpy.zeros(num_commands)
+        steps[has_end] = args[offsets[has_end] + command_end_arg[has_end]]
+
+        # Commands that start over, and the stretches of commands from each of them to the next.
+        starts = numpy.flatnonzero(sets[codes] | is_close)
+        if len(starts) > num_commands // 8:
+            # Mostly absolute commands, that's a loop in Python anyway.
+            return None
+        bounds = [0, *starts[starts > 0].tolist(), num_commands]
+        values = numpy.empty(num_commands)
+        for start, end in zip(bounds, bounds[1:]):
+            if is_close[start]:
+                move_index = move_indices[start]
+                steps[start] = values[move_index] if move_index >= 0 else 0.0
+            numpy.cumsum(steps[start:end], out=values[start:end])
+        if len(starts) == 0 or starts[0] != 0:
+            # Starting from 0.0 like one at a time, which makes a -0.0 0.0.
+            values[:bounds[1]] += 0.0
+        current.append(values)
+
+    # The current point before each command, added to the coordinates of the relative ones.
+    result = args.copy()
+    arg_commands = numpy.repeat(numpy.arange(num_commands), num_args)
+    arg_axes = numpy_tables.relative_axes[codes[arg_commands], numpy.arange(len(args)) - offsets[arg_commands]]
+    for axis, values in enumerate(current):
+        previous = numpy.concatenate(([0.0], values[:-1]))
+        is_axis = arg_axes == axis
+        result[is_axis] += previous[arg_commands[is_axis]]
+    return array('d', result.tobytes())
+
+class NumpyTables():
+    ''' The tables of make_absolute_numpy(), as arrays indexed by command code.
+    '''
+    def __init__(self):
+        codes = range(len(command_types))
+        self.num_args = numpy.array(command_num_args, dtype=numpy.int64)
+        self.is_move = numpy.array([code in move_codes for code in codes])
+        self.is_close = numpy.array([code in (CLOSE, CLOSE_REL) for code in codes])
+        # Where the x resp. y of the end point is in the arguments, -1 if they don't have it.
+        self.end_x_arg = numpy.array([-1 if code in (VERT, VERT_REL, CLOSE, CLOSE_REL) else 0 if code in (HORZ, HORZ_REL) else command_num_args[code] - 2 for code in codes])
+        self.end_y_arg = numpy.array([-1 if code in (HORZ, HORZ_REL, CLOSE, CLOSE_REL) else 0 if code in (VERT, VERT_REL) else command_num_args[code] - 1 for code in codes])
+        # Whether the command sets x resp. y, instead of adding to it or leaving it.
+        self.sets_x = numpy.array([code not in relative_codes and code not in (VERT, CLOSE) for code in codes])
+        self.sets_y = numpy.array([code not in relative_codes and code not in (HORZ, CLOSE) for code in codes])
+        self.relative_axes = numpy.full((len(command_types), max(command_num_args)), -1)
+        for code in relative_codes:
+            self.relative_axes[code, :command_num_args[code]] = relative_axes[code]
+
+numpy_tables = NumpyTables() if numpy is not None else None
+
+def format_command(code, args):
+    # The command as inkex would write it in path data, e.g. "c 1 2 3 4 5 6".
+    return ' '.join([command_letters[code], *(f"{value:.6g}" for value in args)])
@@ -0,0 +1,140 @@
+import re
+import enum
+import math
+
+class ScalingMode(enum.Enum):
+    NONE = enum.auto()
+    UNIFORM = enum.auto()
+    ANISOTROPIC = enum.auto()
+
+class Scaling():
+    def __init__(self, msg_func):
+        self.scaling_mode = ScalingMode.NONE
+        self.msg = msg_func
+        self.measurements = []
+        self.options = []
+
+    def get_path_distance(self, path):
+        # We derive the length by taking the distance between the end points in this path.
+        end_points = list(path.end_points())
+        if not len(end_points) == 2:
+            self.msg("Found a reference path with more than 2 end points. Only use a straight line.")
+            return None
+        # The path is in mm already, like all coordinates (see transforms.get_user_unit_transform()).
+        d = distance(end_points[0], end_points[1])
+        #self.msg(f"p1: {end_points[0]}, p2: {end_points[1]}") # p1: 2936.53, 2152.78, # p2: 3949.3, 2152.78
+        #self.msg(f"Distance is {d}")
+        return d
+
+    def extract_measurements(self, measurement):
+        # The measurement specification can technically be any Javascript, but we're not going to parse it and check if
+        # it's valid and so on. Just look for strings that start with 'measurements.' or 'options.' and call it a day.
+
+        # Regular expression pattern to capture both the dictionary name and its members
+        pattern = r'(measurements|options)\.([a-zA-Z_$][a-zA-Z0-9_$]*)'
+
+        # Find all matches
+        matches = re.findall(pattern, measurement)
+
+        # Separating the results
+        measurements = [member for prefix, member in matches if prefix == 'measurements']
+        options = [member for prefix, member in matches if prefix == 'options']
+
+        return ( measurements, options )
+
+    def init_from_label(self, label, path):
+        #self.msg(f"Found element with label {label}")
+        str_parts = re.split(r'(?i)(measurement(-x|-y)?):', label, maxsplit=1)
+        if len(str_parts) <= 1:
+            return False
+
+        # @todo More accurate checking - if self.scaling_mode has specific values, some of these shouldn't happen. Not
+        # sure how useful this check really is.
+        #if not len(self.measurements) == 0 or not len(self.options) == 0:
+            # How can this happen? Don't think it should.
+        #    return False
+
+        scaling_mode_id = str_parts[1].strip()
+        measurement = str_parts[3].strip()
+
+        if scaling_mode_id == "measurement":
+            if self.scaling_mode == ScalingMode.ANISOTROPIC:
+                self.msg(f"Found scaling mode identifier 'measurement' in element labeled {label} but it is already set to 'anisotropic', error.")
+                return None
+            self.scaling_mode = ScalingMode.UNIFORM
+            self.uniform = measurement
+            self.length = self.get_path_distance(path)
+            measurements, options = self.extract_measurements(measurement)
+            self.measurements = measurements
+            self.options = options
+        elif scaling_mode_id == "measurement-x":
+            if self.scaling_mode == ScalingMode.UNIFORM:
+                self.msg(f"Found scaling mode identifier 'measurement-x' in element labeled {label} but it is already set to 'uniform', error.")
+                return None
+            self.scaling_mode = ScalingMode.ANISOTROPIC
+            self.x = measurement
+            self.length_x = self.get_path_distance(path)
+            measurements, options = self.extract_measurements(measurement)
+            self.measurements.extend(measurements)
+            self.options.extend(options)
+        elif scaling_mode_id == "measurement-y":
+            if self.scaling_mode == ScalingMode.UNIFORM:
+                self.msg(f"Found scaling mode identifier 'measurement-y' in element labeled {label} but it is already set to 'uniform', error.")
+                return None
+            self.scaling_mode = ScalingMode.ANISOTROPIC
+            self.y = measurement
+            self.length_y = self.get_path_distance(path)
+            measurements, options = self.extract_measurements(measurement)
+            self.measurements.extend(measurements)
+            self.options.extend(options)
+        else:
+            # Huh? Can not happen.
+            self.msg(f"Found scaling mode identifier {scaling_mode_id} in element labeled {label}, illegal value, error.")
+
+        return True
+
+    def format_points_preamble(self, element_id):
+        result = ""
+
+        if self.scaling_mode == ScalingMode.NONE:
+            # Do nothing
+            pass
+        elif self.scaling_mode == ScalingMode.UNIFORM:
+            result += f"scaling_{element_id} = ({self.uniform}) / {self.length}\n"
+        elif self.scaling_mode == ScalingMode.ANISOTROPIC:
+            result += f"scaling_{element_id}_x = ({self.x}) / {self.length_x}\n"
+            result += f"scaling_{element_id}_y = ({self.y}) / {self.length_y}\n"
+        else:
+            self.msg(f"Unhandled value for self.scaling_mode: {self.scaling_mode}")
+
+        return result
+
+    def format_new_point_call(self, point_name, element_id, x, y):
+        if self.scaling_mode == ScalingMode.NONE:
+            # Do nothing
+            pass
+        elif self.scaling_mode == ScalingMode.UNIFORM:
+            x = f"{x} * scaling_{element_id}"
+            y = f"{y} * scaling_{element_id}"
+        elif self.scaling_mode == ScalingMode.ANISOTROPIC:
+            x = f"{x} * scaling_{element_id}_x"
+            y = f"{y} * scaling_{element_id}_y"
+        else:
+            self.msg(f"Unhandled value for self.scaling_mode: {self.scaling_mode}")
+
+        return f"points.{point_name} = new Point({x}, {y})\n"
+
+    def format_scale_factors(self, element_id):
+        # The x and y scaling factors set up by format_points_preamble(), as JS expressions, or None if not scaling.
+        if self.scaling_mode == ScalingMode.NONE:
+            return None
+        elif self.scaling_mode == ScalingMode.UNIFORM:
+            return (f"scaling_{element_id}", f"scaling_{element_id}")
+        elif self.scaling_mode == ScalingMode.ANISOTROPIC:
+            return (f"scaling_{element_id}_x", f"scaling_{element_id}_y")
+        else:
+            self.msg(f"Unhandled value for self.scaling_mode: {self.scaling_mode}")
+            return None
+
+def distance(p1, p2):
+    return math.sqrt(pow(abs(p1[0] - p2[0]), 2) + pow(abs(p1[1] - p2[1]), 2))
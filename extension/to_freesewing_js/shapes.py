@@ -0,0 +1,195 @@
+''' The path data of the SVG elements that are converted: paths, and the basic shapes (rect, circle, ellipse, line,
+polyline and polygon), which are turned into the same lines and curves as if they had been converted with 'Object to
+Path' in Inkscape. Circles, ellipses and rounded corners become cubic Beziers, because that's what FS paths have.
+
+Parsing the 'd' attribute of a path is by far the most work of these, and traced paths can have huge ones, so the
+parsed path data is kept by 'd' string (see PathDataCache) and shared by all elements with the same path data. It is
+kept as a pathdata.PathData, which is much smaller than the inkex.paths.Path it is parsed into.
+'''
+
+import math
+import re
+
+import inkex
+import inkex.paths
+import inkex.units
+
+from .pathdata import PathData
+from .transforms import get_view_box, length_to_mm
+
+# The distance of the control points from the ends of a cubic Bezier that approximates a quarter circle of radius 1.
+# The error is at most 0.027% of the radius.
+quarter_circle_kappa = 4 / 3 * (math.sqrt(2) - 1)
+
+number_regex = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+class ShapeError(ValueError):
+    ''' A shape that can't be converted, with the message saying why. '''
+
+def get_viewport_size(element):
+    # The width and height of the viewport in user units, which percentages are of: the size of the viewBox of the
+    # document, or without one, its width and height in px. None if it has no absolute size. Nested <svg>'s with their
+    # own viewports aren't taken into account.
+    root = element.getroottree().getroot()
+    view_box = get_view_box(root)
+    if view_box is not None:
+        return view_box[2:]
+    width, height = length_to_mm(root.get('width')), length_to_mm(root.get('height'))
+    if width is None or height is None:
+        return None
+    mm_in_px = inkex.units.CONVERSIONS['mm'] / inkex.units.CONVERSIONS['px']
+    return (width * mm_in_px, height * mm_in_px)
+
+def get_length(element, name, axis):
+    ''' An attribute of a shape in user units, 0 if it isn't there. Percentages are of the width (axis 'x') or height
+    (axis 'y') of the viewport, or for other lengths, like the radius of a circle, of its diagonal divided by sqrt(2).
+    '''
+    value = element.get(name)
+    if value is None:
+        return 0.0
+    if value.strip().endswith('%'):
+        viewport_size = get_viewport_size(element)
+        if viewport_size is None:
+            raise ShapeError(f"Shape '{element.get_id()}' uses a percentage length, but the document has no size it could be of, skipped.")
+        try:
+            percentage = float(value.strip()[:-1])
+        except ValueError:
+            raise ShapeError(f"Shape '{element.get_id()}' has an invalid length '{value}', skipped.")
+        width, height = viewport_size
+        reference = width if axis == 'x' else height if axis == 'y' else math.sqrt((width * width + height * height) / 2)
+        return percentage / 100 * reference
+    return element.to_dimensionless(value)
+
+def make_path(commands):
+    path = inkex.paths.Path()
+    path.extend(commands)
+    return path
+
+def quarter_ellipse(start_x, start_y, end_x, end_y, start_horizontal):
+    # A cubic Bezier for a quarter of an ellipse from start to end. If start_horizontal, the tangent at start is
+    # horizontal (and that at end vertical), otherwise the other way around.
+    if start_horizontal:
+        cp1 = (start_x + quarter_circle_kappa * (end_x - start_x), start_y)
+        cp2 = (end_x, end_y - quarter_circle_kappa * (end_y - start_y))
+    else:
+        cp1 = (start_x, start_y + quarter_circle_kappa * (end_y - start_y))
+        cp2 = (end_x - quarter_circle_kappa * (end_x - start_x), end_y)
+    return inkex.paths.Curve(*cp1, *cp2, end_x, end_y)
+
+def ellipse_path(cx, cy, rx, ry):
+    # Four quarters, clockwise from the rightmost point, like Inkscape does.
+    return make_path([
+        inkex.paths.Move(cx + rx, cy),
+        quarter_ellipse(cx + rx, cy, cx, cy + ry, False),
+        quarter_ellipse(cx, cy + ry, cx - rx, cy, True),
+        quarter_ellipse(cx - rx, cy, cx, cy - ry, False),
+        quarter_ellipse(cx, cy - ry, cx + rx, cy, True),
+        inkex.paths.ZoneClose(),
+    ])
+
+def path_element_path(element):
+    return inkex.paths.Path(element.get('d'))
+
+def rect_path(element):
+    x, y = get_length(element, 'x', 'x'), get_length(element, 'y', 'y')
+    width, height = get_length(element, 'width', 'x'), get_length(element, 'height', 'y')
+    if width <= 0 or height <= 0:
+        return None
+
+    # If only one of rx and ry is given, it's used for both.
+    rx, ry = get_length(element, 'rx', 'x'), get_length(element, 'ry', 'y')
+    rx, ry = (rx if rx > 0 else ry), (ry if ry > 0 else rx)
+    if rx <= 0:
+        return make_path([
+            inkex.paths.Move(x, y),
+            inkex.paths.Line(x + width, y),
+            inkex.paths.Line(x + width, y + height),
+            inkex.paths.Line(x, y + height),
+            inkex.paths.ZoneClose(),
+        ])
+
+    rx, ry = min(rx, width / 2), min(ry, height / 2)
+    right, bottom = x + width, y + height
+    return make_path([
+        inkex.paths.Move(x + rx, y),
+        inkex.paths.Line(right - rx, y),
+        quarter_ellipse(right - rx, y, right, y + ry, True),
+        inkex.paths.Line(right, bottom - ry),
+        quarter_ellipse(right, bottom - ry, right - rx, bottom, False),
+        inkex.paths.Line(x + rx, bottom),
+        quarter_ellipse(x + rx, bottom, x, bottom - ry, True),
+        inkex.paths.Line(x, y + ry),
+        quarter_ellipse(x, y + ry, x + rx, y, False),
+        inkex.paths.ZoneClose(),
+    ])
+
+def circle_path(element):
+    r = get_length(element, 'r', 'r')
+    if r <= 0:
+        return None
+    return ellipse_path(get_length(element, 'cx', 'x'), get_length(element, 'cy', 'y'), r, r)
+
+def ellipse_element_path(element):
+    rx, ry = get_length(element, 'rx', 'x'), get_length(element, 'ry', 'y')
+    if rx <= 0 or ry <= 0:
+        return None
+    return ellipse_path(get_length(element, 'cx', 'x'), get_length(element, 'cy', 'y'), rx, ry)
+
+def line_path(element):
+    return make_path([
+        inkex.paths.Move(get_length(element, 'x1', 'x'), get_length(element, 'y1', 'y')),
+        inkex.paths.Line(get_length(element, 'x2', 'x'), get_length(element, 'y2', 'y')),
+    ])
+
+def polyline_path(element, close=False):
+    coordinates = [float(value) for value in number_regex.findall(element.get('points', ''))]
+    # An odd number of coordinates is an error; like browsers, draw what's there up to that.
+    if len(coordinates) < 4:
+        return None
+    commands = [inkex.paths.Move(coordinates[0], coordinates[1])]
+    commands.extend(inkex.paths.Line(coordinates[index], coordinates[index + 1]) for index in range(2, len(coordinates) - 1, 2))
+    if close:
+        commands.append(inkex.paths.ZoneClose())
+    return make_path(commands)
+
+def polygon_path(element):
+    return polyline_path(element, close=True)
+
+class PathDataCache():
+    ''' The parsed path data of path elements, by their 'd' attribute, so that every 'd' is parsed at most once, however
+    many elements have it and however often they are converted (e.g. as part of a part layer and as what a clone refers
+    to). The PathData's are shared, so they must not be changed; transforms.transform_path() makes a new one.
+    '''
+    def __init__(self):
+        self.paths = {}
+
+    def clear(self):
+        self.paths.clear()
+
+    def get_path(self, element):
+        ''' The PathData of a path or basic shape (see element_paths), or None if it has none.
+        '''
+        get_path = element_paths[element.tag]
+        if get_path is not path_element_path:
+            path = get_path(element)
+            return PathData.from_path(path) if path is not None else None
+        d = element.get('d')
+        path = self.paths.get(d)
+        if path is None:
+            path = self.paths[d] = PathData.from_path(inkex.paths.Path(d))
+        return path
+
+# The function that makes the path data of an element, by tag. Also for documents without the SVG namespace; inkex
+# gives these elements the same types.
+element_paths = {}
+for tag, get_path in {
+    'path': path_element_path,
+    'rect': rect_path,
+    'circle': circle_path,
+    'ellipse': ellipse_element_path,
+    'line': line_path,
+    'polyline': polyline_path,
+    'polygon': polygon_path,
+}.items():
+    element_paths[inkex.addNS(tag, 'svg')] = get_path
+    element_paths[tag] = get_path
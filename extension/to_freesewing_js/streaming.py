@@ -0,0 +1,184 @@
+''' Conversion of a complete document while it is being parsed, for documents too big to comfortably hold in memory,
+like traced pattern sheets with embedded images.
+
+convert_streaming() gives the same result as convert(), but instead of first loading the whole document it parses it
+incrementally. Every part layer is converted as soon as it is complete and then thrown away, like everything that isn't
+in a part layer, so at any time only the part layers that are being read (and the 'metadata' layer) are in memory.
+
+The <defs> are kept, for the clones that refer to what's in them. Clones can also refer to elements in the part layers
+that are being read, but not to anything that has already been thrown away.
+
+The user units of the document are worked out from its root element when the first part layer is complete; a
+sodipodi:namedview that only comes after that isn't taken into account for it.
+'''
+
+import os
+
+import inkex
+# The element class lookup that inkex.load_svg() uses, so that the elements get the same inkex types.
+from inkex.elements._parser import NodeBasedLookup
+from lxml import etree
+
+from .model import ConvertOptions, DesignResult
+from .converter import Converter, namedview_tag, document_units_attrib_name
+from .output import render_design
+from .transforms import get_user_unit_transform
+from .index import get_part_name, svg_g_tag, svg_text_tag, groupmode_attrib_name, label_attrib_name
+
+docname_attrib_name = inkex.addNS('docname', 'sodipodi')
+svg_defs_tag = inkex.addNS('defs', 'svg')
+
+# How much of the document to parse at a time.
+read_chunk_size = 64 * 1024
+
+def read_chunks(source):
+    ''' 'source' can be the SVG source (str or bytes), a filename or a binary file object.
+    '''
+    if isinstance(source, (str, bytes)) and source.lstrip()[:1] in ('<', b'<'):
+        for offset in range(0, len(source), read_chunk_size):
+            yield source[offset:offset + read_chunk_size]
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield from iter(lambda: file.read(read_chunk_size), b'')
+    else:
+        yield from iter(lambda: source.read(read_chunk_size), b'')
+
+def convert_streaming(source, options=None, msg=None) -> DesignResult:
+    ''' Like convert(), but parsing the document piece by piece. See read_chunks() for what 'source' can be.
+    '''
+    messages = []
+    msg = msg if msg is not None else messages.append
+    converter = Converter(options if options is not None else ConvertOptions(), msg)
+
+    # Same settings as inkex.load_svg()
+    parser = etree.XMLPullParser(events=('start', 'end'), huge_tree=True, strip_cdata=False, recover=True)
+    parser.set_element_class_lookup(NodeBasedLookup())
+
+    document_name = None
+    root = None
+    document_units = None
+    user_unit_transform = None
+    metadata_layer = None
+    metadata_layer_is_open = False
+    metadata_messages = None
+    design_name = None
+
+    # Parts are converted when their layer ends, which for nested part layers isn't the order they start in. To give
+    # the same result as convert(), collect a [part, messages] slot for each part in the order they start.
+    part_slots = []
+    # The part layers being read, innermost last: (layer, part name, elements of the part, slot).
+    open_part_layers = []
+    part_elements = None
+
+    # What clones can refer to: the elements in <defs>, and those of the part layers being read.
+    defs_elements_by_id = {}
+    part_elements_by_id = {}
+    open_defs = 0
+    converter.get_element_by_id = lambda element_id: defs_elements_by_id.get(element_id, part_elements_by_id.get(element_id))
+
+    def handle_events():
+        nonlocal document_name, root, document_units, user_unit_transform, metadata_layer, metadata_layer_is_open, metadata_messages, design_name, part_elements, open_defs
+
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = element
+                    document_name = element.get(docname_attrib_name, "")
+
+                if element.tag == svg_g_tag and element.get(groupmode_attrib_name) == "layer":
+                    if metadata_layer is None and element.get(label_attrib_name) == "metadata":
+                        metadata_layer = element
+                        metadata_layer_is_open = True
+
+                    part_name = get_part_name(element)
+                    if part_name is not None:
+                        part_elements = []
+                        slot = [None, []]
+                        part_slots.append(slot)
+                        open_part_layers.append((element, part_name, part_elements, slot))
+
+                if element.tag == svg_defs_tag:
+                    open_defs += 1
+                element_id = element.get('id')
+                if element_id is not None:
+                    # With duplicate ids, the first one counts, like for getElementById().
+                    if open_defs:
+                        defs_elements_by_id.setdefault(element_id, element)
+                    elif part_elements is not None:
+                        part_elements_by_id.setdefault(element_id, element)
+
+                if part_elements is not None:
+                    part_elements.append(element)
+                continue
+
+            if element.tag == svg_defs_tag:
+                open_defs -= 1
+            elif element.tag == namedview_tag and element.getparent() is root:
+                document_units = element.get(document_units_attrib_name)
+
+            if element is metadata_layer:
+                name_elements = [text for text in metadata_layer.iter(svg_text_tag) if text.get(label_attrib_name) == "design-name"]
+                metadata_messages = []
+                converter.msg = metadata_messages.append
+                design_name, *placeholder = converter.parse_metadata_layer(document_name, metadata_layer, name_elements)
+                metadata_layer_is_open = False
+
+            if open_part_layers and open_part_layers[-1][0] is element:
+                layer, part_name, elements, slot = open_part_layers.pop()
+                part_elements = open_part_layers[-1][2] if open_part_layers else None
+
+                converter.msg = slot[1].append
+                if user_unit_transform is None:
+                    user_unit_transform = get_user_unit_transform(root, document_units)
+                    converter.transforms.root_transform = user_unit_transform
+                slot[0] = converter.make_part(part_name, elements)
+
+                # The elements of a nested part layer don't belong to the part(s) around it, so it can go too.
+                if not metadata_layer_is_open:
+                    layer.clear()
+                    for part_element in elements:
+                        part_element_id = part_element.get('id')
+                        if part_elements_by_id.get(part_element_id) is part_element:
+                            del part_elements_by_id[part_element_id]
+                # Nothing that comes after an outermost part layer is inside the groups of which we know the transform.
+                if not open_part_layers:
+                    converter.transforms.clear()
+                    converter.path_data.clear()
+                    # Only the definitions of what's in <defs> are still of use.
+                    for definition_element in list(converter.clone_definitions):
+                        if defs_elements_by_id.get(definition_element.get('id')) is not definition_element:
+                            del converter.clone_definitions[definition_element]
+
+            # Anything that isn't in a part layer, the metadata layer or <defs> has been dealt with, throw it and
+            # whatever came before it away. What is in <defs> stays alive through defs_elements_by_id, also once it is
+            # out of the document.
+            if not open_part_layers and not metadata_layer_is_open and not open_defs:
+                if element.tag != svg_defs_tag:
+                    element.clear()
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    for chunk in read_chunks(source):
+        parser.feed(chunk)
+        handle_events()
+    parser.close()
+    handle_events()
+
+    if metadata_messages is None:
+        metadata_messages = []
+        converter.msg = metadata_messages.append
+        design_name, *placeholder = converter.parse_metadata_layer(document_name, None, [])
+
+    # Pass on the messages in the same order as convert() would.
+    converter.msg = msg
+    for message in metadata_messages:
+        msg(message)
+    for part, part_messages in part_slots:
+        for message in part_messages:
+            msg(message)
+
+    parts = [part for part, part_messages in part_slots]
+    direct_emitter = getattr(converter.options, 'direct_emitter', True)
+    return DesignResult(design_name, parts, render_design(design_name, parts, direct_emitter), messages)
@@ -0,0 +1,163 @@
+''' Loading of the Jinja templates in the 'templates' directory.
+
+To save lexing, parsing and compiling the templates on every run, they can be precompiled to Python modules in the
+'compiled_templates' directory, which is shipped with the extension. After changing a template, rebuild them with
+
+    python -m to_freesewing_js.templates
+
+from the 'extension' directory. A compiled template is only used if it was made from the current template source (and
+with the vendored jinja2 version); otherwise the source template is used, so a forgotten rebuild costs speed, not
+correctness.
+
+Templates that are compiled from source at run time (because there is no up to date compiled version) are kept in a
+bytecode cache in the user's cache directory, so that only the first run after a template changed pays for compiling.
+'''
+
+import sys, os
+import functools
+import hashlib
+import json
+
+extension_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+template_dir = os.path.join(extension_dir, 'templates')
+compiled_template_dir = os.path.join(extension_dir, 'compiled_templates')
+manifest_filename = os.path.join(compiled_template_dir, 'manifest.json')
+
+def indent_filter(s, num_spaces=4):
+    indent = ' ' * num_spaces
+    # Use `line` in the condition to check if it contains more than just whitespace
+    return '\n'.join(indent + line if line.strip() else '' for line in s.split('\n'))
+
+def source_hash(template_name):
+    with open(os.path.join(template_dir, template_name), 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def user_cache_dir():
+    if sys.platform == 'win32':
+        base_dir = os.environ.get('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    elif sys.platform == 'darwin':
+        base_dir = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base_dir, 'to-freesewing-js', 'templates')
+
+def get_bytecode_cache():
+    ''' A jinja2 bytecode cache in user_cache_dir(), or None if that directory can't be made. The cache entries hold a
+    checksum of the template source they were compiled from, so they are replaced automatically when a template changes.
+    '''
+    from jinja2 import FileSystemBytecodeCache
+
+    class ForgivingBytecodeCache(FileSystemBytecodeCache):
+        # The cache is only an optimization, so never fail a conversion because it can't be read or written.
+
+        def load_bytecode(self, bucket):
+            try:
+                super().load_bytecode(bucket)
+            except Exception:
+                bucket.reset()
+
+        def dump_bytecode(self, bucket):
+            try:
+                super().dump_bytecode(bucket)
+            except OSError:
+                pass
+
+    cache_dir = user_cache_dir()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return None
+
+    return ForgivingBytecodeCache(cache_dir)
+
+def create_environment(loader, bytecode_cache=None):
+    ''' An Environment with everything our templates need. Compiling and rendering must use the same settings.
+    '''
+    from jinja2 import Environment
+
+    env = Environment(loader=loader, bytecode_cache=bytecode_cache)
+    env.filters['indent'] = indent_filter
+    return env
+
+@functools.lru_cache(maxsize=None)
+def get_loader():
+    ''' The loader for our templates: the compiled ones where they're up to date, the sources otherwise. Made once, so
+    that the compiled modules are only imported once per process.
+    '''
+    import jinja2
+    from jinja2 import FileSystemLoader, ModuleLoader
+
+    class PrecompiledLoader(ModuleLoader):
+        def __init__(self, manifest):
+            super().__init__(compiled_template_dir)
+            self.manifest = manifest
+            self.source_loader = FileSystemLoader(template_dir)
+
+        def is_up_to_date(self, name):
+            return name in self.manifest['templates'] and self.manifest['templates'][name] == source_hash(name)
+
+        def get_source(self, environment, template):
+            return self.source_loader.get_source(environment, template)
+
+        def list_templates(self):
+            return self.source_loader.list_templates()
+
+        def load(self, environment, name, globals=None):
+            if self.is_up_to_date(name):
+                return super().load(environment, name, globals)
+            return self.source_loader.load(environment, name, globals)
+
+    try:
+        with open(manifest_filename, 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        manifest = None
+
+    if manifest is None or manifest.get('jinja2_version') != jinja2.__version__:
+        return FileSystemLoader(template_dir)
+
+    return PrecompiledLoader(manifest)
+
+@functools.lru_cache(maxsize=None)
+def get_environment():
+    ''' The Environment used for all rendering. Shared, so that every template is loaded and compiled only once per
+    process, no matter how many files are rendered from it.
+    '''
+    return create_environment(get_loader(), get_bytecode_cache())
+
+def compile_templates():
+    ''' Compile all templates into compiled_template_dir and record what they were made from.
+    '''
+    import jinja2
+    from jinja2 import FileSystemLoader
+
+    os.makedirs(compiled_template_dir, exist_ok=True)
+    for filename in os.listdir(compiled_template_dir):
+        if filename.startswith('tmpl_') and filename.endswith('.py'):
+            os.unlink(os.path.join(compiled_template_dir, filename))
+
+    env = create_environment(FileSystemLoader(template_dir))
+    env.compile_templates(compiled_template_dir, zip=None, ignore_errors=False, log_function=lambda message: print(message, file=sys.stderr))
+
+    manifest = {
+        'jinja2_version': jinja2.__version__,
+        'templates': {name: source_hash(name) for name in env.list_templates()},
+    }
+    with open(manifest_filename, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+    return manifest
+
+if __name__ == '__main__':
+    compile_templates()
+
+    # The direct emitter for path files has to be kept in sync with path.mjs.tpl by hand, remind whoever changed it.
+    from .output import direct_emitter_is_current, verify_direct_emitter
+    if not direct_emitter_is_current():
+        print("path.mjs.tpl changed: update output.emit_path_module() and output.direct_emitter_template_hash to match. Until then the template is used for all path files.", file=sys.stderr)
+        sys.exit(1)
+    failures = verify_direct_emitter()
+    if failures:
+        print(f"output.emit_path_module() doesn't produce the same output as path.mjs.tpl for: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
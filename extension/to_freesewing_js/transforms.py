@@ -0,0 +1,222 @@
+''' Applying the SVG 'transform' attributes of elements, and of the groups and layers they are in, to their path data.
+The transform of the document itself, from its user units to mm, comes first; so all coordinates end up in mm, which is
+what FS uses.
+'''
+
+import math
+import re
+from array import array
+
+import inkex
+import inkex.units
+
+from .arcs import arcs_to_cubics, default_arc_tolerance
+from .pathdata import PathData, MOVE, LINE, HORZ, VERT, CURVE, SMOOTH, QUADRATIC, TEPID_QUADRATIC, ARC, CLOSE, arc_codes, make_absolute
+
+# What a user unit is if the document doesn't say.
+default_user_unit = 'px'
+
+def length_to_mm(value):
+    # A length like the width and height of a document in mm, or None if it has no absolute size (e.g. a percentage).
+    if value is None:
+        return None
+    parsed = inkex.units.parse_unit(value)
+    if parsed is None or parsed[1] not in inkex.units.CONVERSIONS or parsed[0] <= 0:
+        return None
+    return parsed[0] * inkex.units.CONVERSIONS[parsed[1]] / inkex.units.CONVERSIONS['mm']
+
+def get_view_box(root):
+    # (x, y, width, height) of the viewBox of a document, or None if it has none (or one that doesn't make sense).
+    view_box = [float(value) for value in re.split(r'[\s,]+', (root.get('viewBox') or '').strip()) if value]
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        return None
+    return tuple(view_box)
+
+def get_user_unit_transform(root, document_units=None):
+    ''' The transform from the user units of a document to mm on the page, from the width, height, viewBox and
+    preserveAspectRatio of its root element. Without a viewBox, user units are px. Without a width or height, there is
+    no page size to go by, so the user units are taken to be the document units ('inkscape:document-units' of the
+    sodipodi:namedview), if any.
+    '''
+    user_unit = document_units if document_units in inkex.units.CONVERSIONS else default_user_unit
+    user_unit_in_mm = inkex.units.CONVERSIONS[user_unit] / inkex.units.CONVERSIONS['mm']
+
+    view_box = get_view_box(root)
+    if view_box is None:
+        return inkex.Transform(scale=inkex.units.CONVERSIONS['px'] / inkex.units.CONVERSIONS['mm'])
+    view_box_x, view_box_y, view_box_width, view_box_height = view_box
+
+    width, height = length_to_mm(root.get('width')), length_to_mm(root.get('height'))
+    if width is None and height is None:
+        return inkex.Transform(scale=user_unit_in_mm) @ inkex.Transform(translate=(-view_box_x, -view_box_y))
+    # With only one of them, the other follows from the aspect ratio of the viewBox.
+    if width is None:
+        width = view_box_width * height / view_box_height
+    if height is None:
+        height = view_box_height * width / view_box_width
+
+    scale_x, scale_y = width / view_box_width, height / view_box_height
+    offset_x, offset_y = 0.0, 0.0
+    aspect_ratio = (root.get('preserveAspectRatio') or 'xMidYMid meet').split()
+    if aspect_ratio and aspect_ratio[0] != 'none':
+        # Scaled the same in both directions, and aligned in the page as asked.
+        scale_x = scale_y = max(scale_x, scale_y) if aspect_ratio[-1] == 'slice' else min(scale_x, scale_y)
+        align = aspect_ratio[0]
+        alignments = {'Min': 0.0, 'Mid': 0.5, 'Max': 1.0}
+        offset_x = (width - view_box_width * scale_x) * alignments.get(align[1:4], 0.5)
+        offset_y = (height - view_box_height * scale_y) * alignments.get(align[5:8], 0.5)
+
+    return inkex.Transform(translate=(offset_x, offset_y)) @ inkex.Transform(scale=(scale_x, scale_y)) @ inkex.Transform(translate=(-view_box_x, -view_box_y))
+
+class TransformCache():
+    ''' The composed transform from the document root down to an element. Groups are shared by all elements inside
+    them, so their composed transforms are computed once and kept. root_transform is the transform of the document
+    itself (see get_user_unit_transform()), which all others start with.
+    '''
+    def __init__(self, root_transform=None):
+        self.root_transform = root_transform if root_transform is not None else inkex.Transform()
+        self.group_transforms = {}
+
+    def clear(self):
+        self.group_transforms.clear()
+
+    def get_group_transform(self, group):
+        if group is None:
+            return self.root_transform
+
+        # Go up to the first group we already know (or the root), then compose the transforms on the way back down.
+        # Not recursive, layers can be nested deeply.
+        chain = []
+        transform = None
+        while group is not None:
+            transform = self.group_transforms.get(group)
+            if transform is not None:
+                break
+            chain.append(group)
+            group = group.getparent()
+
+        if transform is None:
+            transform = self.root_transform
+        for group in reversed(chain):
+            own_transform = group.get('transform')
+            if own_transform:
+                transform = transform @ inkex.Transform(own_transform)
+            self.group_transforms[group] = transform
+
+        return transform
+
+    def get_transform(self, element):
+        ''' The transform that maps the coordinates of element to those of the document root.
+        '''
+        transform = self.get_group_transform(element.getparent())
+        own_transform = element.get('transform')
+        if own_transform:
+            transform = transform @ inkex.Transform(own_transform)
+        return transform
+
+def get_transform_within(element, ancestor):
+    ''' The transform that maps the coordinates of element to those of the parent of ancestor, i.e. the transforms of
+    element, ancestor and everything in between. ancestor may be element itself.
+    '''
+    transform = inkex.Transform()
+    while element is not None:
+        own_transform = element.get('transform')
+        if own_transform:
+            transform = inkex.Transform(own_transform) @ transform
+        if element is ancestor:
+            break
+        element = element.getparent()
+    return transform
+
+# Commands whose arguments are all points
+point_codes = {MOVE, LINE, CURVE, SMOOTH, QUADRATIC, TEPID_QUADRATIC}
+
+def get_max_scale(transform):
+    # The most that transform makes any distance longer (the largest singular value of its linear part).
+    sum_of_squares = transform.a ** 2 + transform.b ** 2 + transform.c ** 2 + transform.d ** 2
+    determinant = transform.a * transform.d - transform.b * transform.c
+    return math.sqrt((sum_of_squares + math.sqrt(max(0.0, sum_of_squares ** 2 - 4 * determinant ** 2))) / 2)
+
+def transform_path(path: PathData, transform: inkex.Transform, arc_tolerance=default_arc_tolerance) -> PathData:
+    ''' The path with all its points transformed, as absolute commands. Horizontal and vertical lines become lines,
+    because they don't stay horizontal or vertical under every transform, and arcs become curves that are at most
+    arc_tolerance (after transforming) from the arc, because FS paths don't have arcs. The points of all commands are
+    transformed in one go, and all arcs are converted together (see arcs.arcs_to_cubics(), which uses NumPy for
+    that if it can), after making all commands absolute in one go (see pathdata.make_absolute()). Returns path itself
+    if there is nothing to do, so the result must not be changed.
+    '''
+    if not transform and arc_codes.isdisjoint(path.commands):
+        return path
+
+    # Make every command a list of points: collect all their coordinates in one flat list, and remember how many
+    # coordinates each command has.
+    commands = [] # (command code, number of coordinates) or (None, index in arcs)
+    coordinates = []
+    arcs = [] # (start x, start y, absolute arguments)
+    current_x, current_y = 0.0, 0.0
+    start_x, start_y = 0.0, 0.0
+    previous_code = None
+    for code, args in make_absolute(path):
+        if code == SMOOTH and previous_code == ARC:
+            # A smooth curve after an arc starts at the current point. Once the arc is curves, it would start with the
+            # reflection of the last control point of those, so it becomes a curve that says where it starts.
+            args = (current_x, current_y, *args)
+            code = CURVE
+        previous_code = code
+
+        if code in point_codes:
+            pass
+        elif code == HORZ:
+            args = (args[0], current_y)
+            code = LINE
+        elif code == VERT:
+            args = (current_x, args[0])
+            code = LINE
+        elif code == CLOSE:
+            commands.append((CLOSE, 0))
+            current_x, current_y = start_x, start_y
+            continue
+        else:
+            # Arcs, converted below
+            rx, ry, angle, large_arc, sweep, x, y = args
+            commands.append((None, len(arcs)))
+            arcs.append((current_x, current_y, rx, ry, angle, large_arc, sweep, x, y))
+            current_x, current_y = x, y
+            continue
+
+        commands.append((code, len(args)))
+        coordinates.extend(args)
+        current_x, current_y = args[-2], args[-1]
+        if code == MOVE:
+            start_x, start_y = current_x, current_y
+
+    if arcs:
+        # Put the curves of the arcs in between the other commands. The tolerance is for the transformed curves.
+        curves = arcs_to_cubics(arcs, arc_tolerance / max(get_max_scale(transform), 1e-12))
+        point_commands, point_coordinates = commands, coordinates
+        commands, coordinates = [], []
+        offset = 0
+        for code, count in point_commands:
+            if code is not None:
+                commands.append((code, count))
+                coordinates.extend(point_coordinates[offset:offset + count])
+                offset += count
+                continue
+            arc_coordinates = curves[count]
+            if arc_coordinates is None:
+                # A straight line
+                commands.append((LINE, 2))
+                coordinates.extend(arcs[count][7:9])
+            else:
+                commands.extend([(CURVE, 6)] * (len(arc_coordinates) // 6))
+                coordinates.extend(arc_coordinates)
+
+    # Transform all points at once.
+    a, b, c, d, e, f = transform.a, transform.b, transform.c, transform.d, transform.e, transform.f
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    transformed = array('d', [0.0]) * len(coordinates)
+    transformed[0::2] = array('d', [a * x + c * y + e for x, y in zip(xs, ys)])
+    transformed[1::2] = array('d', [b * x + d * y + f for x, y in zip(xs, ys)])
+
+    return PathData(array('B', [code for code, count in commands]), transformed)